@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+# Set the path to your python3 above
+
+"""
+GoMC Monte Carlo Ninuki player
+Runs random playouts from every candidate move near the stones
+for a fixed wall-clock budget, and plays the move with the best win rate.
+"""
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from gtp_connection import GtpConnection
+from board_base import DEFAULT_SIZE, GO_POINT, GO_COLOR, EMPTY, PASS
+from board import GoBoard
+from board_batch import BoardBatch
+from board_util import GoBoardUtil
+from engine import GoEngine
+
+"""
+Largest number of playouts run for each candidate move in one batch.
+"""
+PLAYOUTS_PER_MOVE: int = 16
+
+"""
+Number of games in the first batch, which measures the speed of the
+playouts. Later batches are sized to use at most half the time left.
+"""
+FIRST_BATCH_GAMES: int = 8
+
+
+class GoMC(GoEngine):
+    def __init__(self, playouts_per_move: int = PLAYOUTS_PER_MOVE) -> None:
+        """
+        Go player that estimates the win rate of each candidate move by
+        random playouts, until its time_limit is used up.
+        The playouts of a batch run together in one BoardBatch, and
+        are spread evenly over the candidates, batch after batch.
+        time_limit is a hard limit: playouts still running at the
+        deadline are stopped and not counted. Candidates are tried in
+        the order of ThreatIndex.point_score, which also decides
+        between equal win rates, e.g. when no playout finishes.
+        """
+        GoEngine.__init__(self, "GoMC", 1.0)
+        self.playouts_per_move: int = playouts_per_move
+        self.playouts: int = 0
+        self.search_time: float = 0.0
+
+    def get_move(self, board: GoBoard, color: GO_COLOR) -> GO_POINT:
+        start = time.time()
+        self.playouts = 0
+        self.search_time = 0.0
+        moves: List[GO_POINT] = \
+            GoBoardUtil.generate_candidate_moves(board, color)
+        if not moves:
+            return PASS
+        if len(moves) == 1:
+            return moves[0]
+        # An immediate win needs no simulation, and an immediate
+        # opponent win must be blocked
+        wins = board.winning_moves(color)
+        if wins:
+            return wins[0]
+        blocks = board.forced_blocks(color)
+        if blocks:
+            moves = blocks
+
+        # Best static value first: these get the first playouts, and
+        # win ties of the win rate
+        moves.sort(key=lambda m: board.threats.point_score(m, color),
+                   reverse=True)
+        candidates = np.array(moves, dtype=GO_POINT)
+        n = len(candidates)
+        scores = np.zeros(n)
+        counts = np.zeros(n)
+        deadline = start + self.time_limit
+        max_games = n * self.playouts_per_move
+        num_games = min(FIRST_BATCH_GAMES, max_games)
+        first = 0
+        while True:
+            batch_start = time.time()
+            if batch_start >= deadline:
+                break
+            # The next num_games candidates in turn, wrapping around
+            indexes = (first + np.arange(num_games)) % n
+            first = (first + num_games) % n
+            game_scores, done = self._simulate(
+                board, color, candidates[indexes], deadline)
+            np.add.at(scores, indexes, game_scores)
+            np.add.at(counts, indexes, done)
+            now = time.time()
+            finished = int(np.count_nonzero(done))
+            if finished > 0:
+                rate = finished / max(now - batch_start, 1e-6)
+                num_games = int(rate * (deadline - now) / 2)
+            else:
+                num_games //= 2
+            num_games = max(1, min(num_games, max_games))
+        self.playouts = int(counts.sum())
+        self.search_time = time.time() - start
+        # With one win and one loss added to each candidate, a candidate
+        # with few playouts is not taken on a lucky win
+        rates = (scores + 1) / (counts + 2)
+        return candidates[np.argmax(rates)]
+
+    def _simulate(self, board: GoBoard, color: GO_COLOR, moves: np.ndarray,
+                  deadline: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run one random game after each of moves, until the games are
+        over or the deadline is reached.
+        Returns the score of each game, 1 for a win and 0.5 for a draw
+        of color, 0 for a loss or a game that is not over, and
+        whether each game is over.
+        """
+        batch = BoardBatch.from_board(board, len(moves))
+        batch.current_player[:] = color
+        batch.play_moves(moves)
+        winners = batch.play_random_games(deadline)
+        done = batch.done
+        return (done & (winners == color)) \
+            + 0.5 * (done & (winners == EMPTY)), done
+
+    def get_stats(self) -> Dict[str, float]:
+        rate = self.playouts / self.search_time if self.search_time > 0 else 0
+        return {"playouts": self.playouts,
+                "time": round(self.search_time, 3),
+                "playouts_per_sec": round(rate, 1)}
+
+
+def run() -> None:
+    """
+    start the gtp connection and wait for commands.
+    """
+    board: GoBoard = GoBoard(DEFAULT_SIZE)
+    con: GtpConnection = GtpConnection(GoMC(), board)
+    con.start_connection()
+
+
+if __name__ == "__main__":
+    run()
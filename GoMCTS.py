@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+# Set the path to your python3 above
+
+"""
+GoMCTS Monte Carlo Tree Search Ninuki player
+Runs UCT search for a fixed wall-clock budget.
+The search tree is kept between genmove commands: when a move is
+played, the root moves down to the matching child, so the statistics
+of that subtree are reused for the next search.
+With pondering on, the search goes on in a background thread during
+the opponent's turn, growing the subtrees of the likely replies.
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+from gtp_connection import GtpConnection
+from board_base import (
+    DEFAULT_SIZE,
+    GO_POINT,
+    GO_COLOR,
+    EMPTY,
+    PASS,
+    opponent,
+)
+from board import GoBoard
+from board_util import GoBoardUtil
+from engine import GoEngine
+
+"""
+Exploration constant of the UCB1 formula.
+"""
+UCT_EXPLORATION: float = 0.4
+
+"""
+Pondering stops when the tree has this many nodes. Each search adds at
+most one node, so the visits of the root bound the size of its tree.
+"""
+MAX_PONDER_NODES: int = 100000
+
+
+class TreeNode(object):
+    def __init__(self, move: GO_POINT, color: GO_COLOR,
+                 parent: Optional['TreeNode']) -> None:
+        """
+        A node of the search tree.
+
+        move: the move that led to this node, PASS for a root
+        color: the color to play in this node
+        wins: wins for the player who made move, 0.5 for a draw
+        untried: candidate moves without a child yet, None until expanded
+        """
+        self.move: GO_POINT = move
+        self.color: GO_COLOR = color
+        self.parent: Optional[TreeNode] = parent
+        self.children: Dict[GO_POINT, TreeNode] = {}
+        self.untried: Optional[List[GO_POINT]] = None
+        self.visits: int = 0
+        self.wins: float = 0.0
+
+    def select_child(self) -> 'TreeNode':
+        """ Return the child with the highest UCB1 value """
+        log_visits = math.log(self.visits)
+        best: Optional[TreeNode] = None
+        best_value = -1.0
+        for child in self.children.values():
+            value = child.wins / child.visits \
+                + UCT_EXPLORATION * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def most_visited_child(self) -> Optional['TreeNode']:
+        if not self.children:
+            return None
+        return max(self.children.values(), key=lambda c: c.visits)
+
+
+class GoMCTS(GoEngine):
+    def __init__(self, max_ponder_nodes: int = MAX_PONDER_NODES) -> None:
+        """
+        Go player that selects moves by UCT search with random playouts.
+        """
+        GoEngine.__init__(self, "GoMCTS", 1.0)
+        self.root: Optional[TreeNode] = None
+        # Hash of the position at self.root, to detect a mismatch
+        # with the board passed to get_move
+        self.root_hash: int = 0
+        self.playouts: int = 0
+        self.reused_visits: int = 0
+        self.search_time: float = 0.0
+        self.ponder_playouts: int = 0
+        self.max_ponder_nodes: int = max_ponder_nodes
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_stop: threading.Event = threading.Event()
+
+    def on_reset(self) -> None:
+        self.root = None
+
+    def start_pondering(self, board: GoBoard) -> None:
+        """
+        Search from the current position in a background thread, on a
+        copy of board, until stop_pondering is called or the tree
+        reaches max_ponder_nodes nodes
+        """
+        if not self.ponder or self._ponder_thread is not None \
+                or self._is_terminal(board):
+            return
+        if self.root is None or self.root_hash != board.hash:
+            self.root = TreeNode(PASS, board.current_player, None)
+            self.root_hash = board.hash
+        self.ponder_playouts = 0
+        self._ponder_stop.clear()
+        self._ponder_thread = threading.Thread(
+            target=self._ponder, args=(board.copy(), self.root), daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder(self, board: GoBoard, root: TreeNode) -> None:
+        while not self._ponder_stop.is_set() \
+                and root.visits < self.max_ponder_nodes:
+            self.search(board, root)
+            self.ponder_playouts += 1
+
+    def stop_pondering(self) -> None:
+        if self._ponder_thread is None:
+            return
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        self._ponder_thread = None
+
+    def on_play(self, board: GoBoard, point: GO_POINT,
+                color: GO_COLOR) -> None:
+        """
+        Move the root down to the child for point, keeping its subtree.
+        """
+        if self.root is None:
+            return
+        child = self.root.children.get(point)
+        if child is None or self.root.color != color:
+            self.root = None
+            return
+        child.parent = None
+        self.root = child
+        self.root_hash = board.hash
+
+    def get_move(self, board: GoBoard, color: GO_COLOR) -> GO_POINT:
+        start = time.time()
+        if self.root is None or self.root.color != color \
+                or self.root_hash != board.hash:
+            self.root = TreeNode(PASS, color, None)
+        self.root_hash = board.hash
+        self.reused_visits = self.root.visits
+        self.playouts = 0
+        deadline = start + self.time_limit
+        while time.time() < deadline:
+            self.search(board, self.root)
+            self.playouts += 1
+        self.search_time = time.time() - start
+        best = self.root.most_visited_child()
+        if best is None:
+            return PASS
+        return best.move
+
+    def search(self, board: GoBoard, root: TreeNode) -> None:
+        """
+        Run one iteration of UCT from root: select, expand, simulate
+        and back up. The board is restored before returning.
+        """
+        node = root
+        depth = 0
+        while self._is_expanded(node) and node.children \
+                and not self._is_terminal(board):
+            node = node.select_child()
+            board.play_move(node.move, opponent(node.color))
+            depth += 1
+        if not self._is_terminal(board):
+            if node.untried is None:
+                node.untried = self._generate_moves(board, node.color)
+            if node.untried:
+                move = node.untried.pop()
+                child = TreeNode(move, opponent(node.color), node)
+                node.children[move] = child
+                board.play_move(move, node.color)
+                depth += 1
+                node = child
+        winner = self.simulate(board)
+        for _ in range(depth):
+            board.undo()
+        while node is not None:
+            node.visits += 1
+            mover = opponent(node.color)
+            if winner == mover:
+                node.wins += 1
+            elif winner == EMPTY:
+                node.wins += 0.5
+            node = node.parent
+
+    def simulate(self, board: GoBoard) -> GO_COLOR:
+        """
+        Play uniformly random moves until the game is over, see
+        GoBoard.random_playout. Returns the winner, EMPTY for a draw.
+        The board is not changed.
+        """
+        return board.random_playout()
+
+    def _generate_moves(self, board: GoBoard,
+                        color: GO_COLOR) -> List[GO_POINT]:
+        """
+        The moves to expand a node with: an immediate win if there is
+        one, else the blocks of the opponent's immediate wins if any,
+        else all candidate moves.
+        """
+        wins = board.winning_moves(color)
+        if wins:
+            return wins[:1]
+        blocks = board.forced_blocks(color)
+        if blocks:
+            return blocks
+        return GoBoardUtil.generate_candidate_moves(board, color)
+
+    def _is_expanded(self, node: TreeNode) -> bool:
+        return node.untried is not None and not node.untried
+
+    def _is_terminal(self, board: GoBoard) -> bool:
+        return board.winner != EMPTY or board.num_empty_points() == 0
+
+    def get_stats(self) -> Dict[str, float]:
+        rate = self.playouts / self.search_time if self.search_time > 0 else 0
+        return {"playouts": self.playouts,
+                "reused_visits": self.reused_visits,
+                "ponder_playouts": self.ponder_playouts,
+                "root_visits": self.root.visits if self.root else 0,
+                "time": round(self.search_time, 3),
+                "playouts_per_sec": round(rate, 1)}
+
+
+def run() -> None:
+    """
+    start the gtp connection and wait for commands.
+    """
+    board: GoBoard = GoBoard(DEFAULT_SIZE)
+    con: GtpConnection = GtpConnection(GoMCTS(), board)
+    con.start_connection()
+
+
+if __name__ == "__main__":
+    run()
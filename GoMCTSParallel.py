@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+# Set the path to your python3 above
+
+"""
+GoMCTSParallel root-parallel Monte Carlo Tree Search Ninuki player
+Each genmove runs an independent GoMCTS search in every worker of a
+process pool, on its own copy of the board and with its own random seed.
+The visit counts and wins of the root children are summed over all
+workers, and the most visited move is played.
+The pool is created on the first genmove and kept for the whole game,
+so the cost of starting the workers is only paid once.
+"""
+import atexit
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gtp_connection import GtpConnection
+from board_base import DEFAULT_SIZE, GO_POINT, GO_COLOR, PASS
+from board import GoBoard
+from engine import GoEngine
+from GoMCTS import GoMCTS
+
+
+def _search_worker(board: GoBoard, color: GO_COLOR, time_limit: float,
+                   seed: int
+                   ) -> Tuple[Dict[GO_POINT, Tuple[int, float]], int, float]:
+    """
+    Run one GoMCTS search in a worker process.
+    Returns the (visits, wins) of each root child, the number of
+    playouts, and the CPU time of the search.
+    """
+    cpu_start = time.process_time()
+    np.random.seed(seed)
+    engine = GoMCTS()
+    engine.time_limit = time_limit
+    engine.get_move(board, color)
+    children = {move: (child.visits, child.wins)
+                for move, child in engine.root.children.items()}
+    return children, engine.playouts, time.process_time() - cpu_start
+
+
+def merge_results(results: List[Tuple[Dict[GO_POINT, Tuple[int, float]], int]]
+                  ) -> Tuple[Dict[GO_POINT, int], Dict[GO_POINT, float], int]:
+    """
+    Sum the visits and wins of each root child, and the playouts, over
+    the results of all workers
+    """
+    visits: Dict[GO_POINT, int] = {}
+    wins: Dict[GO_POINT, float] = {}
+    playouts = 0
+    for children, worker_playouts in results:
+        playouts += worker_playouts
+        for move, (n, w) in children.items():
+            visits[move] = visits.get(move, 0) + n
+            wins[move] = wins.get(move, 0.0) + w
+    return visits, wins, playouts
+
+
+class GoMCTSParallel(GoEngine):
+    def __init__(self, num_workers: Optional[int] = None) -> None:
+        """
+        Go player that runs root-parallel UCT search on num_workers
+        processes, one per core by default.
+        """
+        GoEngine.__init__(self, "GoMCTSParallel", 1.0)
+        self.num_workers: int = num_workers or os.cpu_count() or 1
+        self._pool: Optional[Pool] = None
+        self.playouts: int = 0
+        self.search_time: float = 0.0
+
+    def _get_pool(self) -> Pool:
+        if self._pool is None:
+            self._pool = Pool(self.num_workers)
+            atexit.register(self.close)
+        return self._pool
+
+    def close(self) -> None:
+        """ Shut down the worker processes """
+        GoEngine.close(self)
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            atexit.unregister(self.close)
+
+    def get_move(self, board: GoBoard, color: GO_COLOR) -> GO_POINT:
+        start = time.time()
+        pool = self._get_pool()
+        seeds = np.random.randint(0, 2**31 - 1, size=self.num_workers)
+        results = pool.starmap(
+            _search_worker,
+            [(board, color, self.time_limit, int(seed)) for seed in seeds])
+        visits, wins, self.playouts = merge_results(
+            [(children, playouts) for children, playouts, _ in results])
+        self.worker_cpu_time += sum(cpu for _, _, cpu in results)
+        self.search_time = time.time() - start
+        if not visits:
+            return PASS
+        return max(visits, key=lambda move: (visits[move], wins[move]))
+
+    def get_stats(self) -> Dict[str, float]:
+        rate = self.playouts / self.search_time if self.search_time > 0 else 0
+        return {"workers": self.num_workers,
+                "playouts": self.playouts,
+                "time": round(self.search_time, 3),
+                "playouts_per_sec": round(rate, 1)}
+
+
+def run() -> None:
+    """
+    start the gtp connection and wait for commands.
+    """
+    board: GoBoard = GoBoard(DEFAULT_SIZE)
+    con: GtpConnection = GtpConnection(GoMCTSParallel(), board)
+    con.start_connection()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,313 @@
+"""
+benchmark.py
+Micro- and macro-benchmarks of the board and GTP hot paths.
+
+Every benchmark runs on each board size at each fill level, the
+fraction of the board covered by stones from random moves. The time
+per call is the best of several repeats, each long enough to be
+measured reliably. The repeats of all benchmarks are interleaved, so
+that changes in the speed of the machine during a run affect every
+benchmark alike. Results are written as JSON, keyed by
+"name/size/fill", and can be compared with a stored baseline: a
+benchmark that got slower by more than the threshold is a regression,
+and the exit status is 1.
+
+Usage:
+    python3 benchmark.py --output baseline.json
+    python3 benchmark.py --baseline baseline.json --threshold 0.15
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from board import GoBoard
+from board_base import BLACK, EMPTY, GO_COLOR, GO_POINT
+from board_util import GoBoardUtil
+from engine import GoEngine
+from gtp_connection import GtpConnection, point_to_coord, format_point
+
+BENCHMARK_SIZES: List[int] = [7, 13, 19, 25]
+BENCHMARK_FILLS: List[float] = [0.0, 0.25, 0.5]
+
+"""
+Each repeat runs the benchmark for at least this many seconds
+"""
+MIN_REPEAT_TIME: float = 0.1
+NUM_REPEATS: int = 9
+
+"""
+Default relative slowdown reported as a regression. The short GTP
+benchmarks vary by more than 10% between runs on a shared machine,
+so smaller slowdowns are not reported.
+"""
+DEFAULT_THRESHOLD: float = 0.25
+
+
+def make_position(size: int, fill: float, seed: int = 0) -> GoBoard:
+    """
+    A board with about fill * size * size stones from random moves
+    of alternating colors. Moves that would end the game are taken back.
+    """
+    rng = random.Random(seed)
+    board = GoBoard(size)
+    target = int(fill * size * size)
+    attempts = 0
+    while size * size - board.num_empty_points() < target \
+            and attempts < 10 * size * size:
+        attempts += 1
+        points = board.get_empty_points()
+        point = points[rng.randrange(len(points))]
+        board.play_move(point, board.current_player)
+        if board.winner != EMPTY:
+            board.undo()
+    return board
+
+
+def calls_per_repeat(fn: Callable[[], None]) -> int:
+    """ The number of calls of fn that take at least MIN_REPEAT_TIME """
+    number = 1
+    while time_calls(fn, number) * number < MIN_REPEAT_TIME:
+        number *= 2
+    return number
+
+
+def time_calls(fn: Callable[[], None], number: int) -> float:
+    """ The time in seconds of one call of fn, over number calls """
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number
+
+
+def time_per_call(fn: Callable[[], None], repeats: int = NUM_REPEATS) -> float:
+    """ The best time in seconds of one call of fn, over repeats """
+    number = calls_per_repeat(fn)
+    return min(time_calls(fn, number) for _ in range(repeats))
+
+
+def cycle(items: List) -> Callable[[], object]:
+    """ A function returning the items one after the other, forever """
+    state = [0]
+
+    def next_item() -> object:
+        i = state[0]
+        state[0] = i + 1 if i + 1 < len(items) else 0
+        return items[i]
+    return next_item
+
+
+class BenchmarkEngine(GoEngine):
+    def __init__(self) -> None:
+        """ An engine without search, so GTP benchmarks time only GTP """
+        GoEngine.__init__(self, "Benchmark", 1.0)
+
+    def get_move(self, board: GoBoard, color: GO_COLOR) -> GO_POINT:
+        return GoBoardUtil.generate_random_move(board, color, False)
+
+
+def board_benchmarks(board: GoBoard) -> Dict[str, Callable[[], None]]:
+    """ The functions to time on the position on board """
+    color = board.current_player
+    empty = list(board.get_empty_points())
+    points = [GO_POINT(p) for p in board.tables.points]
+    next_empty = cycle(empty)
+    next_point = cycle(points)
+    connection = GtpConnection(BenchmarkEngine(), board,
+                               outfile=io.StringIO())
+
+    def play_move() -> None:
+        board.play_move(next_empty(), color)
+        board.undo()
+
+    def is_legal() -> None:
+        board.is_legal(next_point(), color)
+
+    return {
+        "play_move+undo": play_move,
+        "is_legal": is_legal,
+        "get_empty_points": board.get_empty_points,
+        "generate_legal_moves":
+            lambda: GoBoardUtil.generate_legal_moves(board, color),
+        "generate_random_move":
+            lambda: GoBoardUtil.generate_random_move(board, color, False),
+        "check_5": lambda: connection.check_5([]),
+        "get_twoD_board": lambda: GoBoardUtil.get_twoD_board(board),
+    }
+
+
+def gtp_benchmarks(board: GoBoard) -> Dict[str, Callable[[], None]]:
+    """
+    Round trips through GtpConnection.get_cmd on the position on board,
+    with the responses written to a buffer
+    """
+    output = io.StringIO()
+    connection = GtpConnection(BenchmarkEngine(), board, outfile=output)
+    color = "b" if board.current_player == BLACK else "w"
+    next_move = cycle([(p, format_point(point_to_coord(p, board.size)))
+                       for p in board.get_empty_points()])
+
+    def run(command: str) -> None:
+        connection.get_cmd(command)
+        output.seek(0)
+        output.truncate()
+
+    def play() -> None:
+        point, move = next_move()
+        run("play {} {}".format(color, move))
+        if board.get_color(point) != EMPTY:
+            board.undo()
+
+    return {
+        "gtp:play": play,
+        "gtp:gogui-rules_legal_moves":
+            lambda: run("gogui-rules_legal_moves"),
+        "gtp:gogui-rules_board": lambda: run("gogui-rules_board"),
+        "gtp:gogui-rules_final_result":
+            lambda: run("gogui-rules_final_result"),
+        "gtp:showboard": lambda: run("showboard"),
+    }
+
+
+def random_game(size: int, seed: int = 0) -> Callable[[], None]:
+    """
+    A whole game of random moves, played and taken back.
+    The same game is played every time, so that timings are comparable.
+    """
+    board = GoBoard(size)
+
+    def play() -> None:
+        np.random.seed(seed)
+        moves = 0
+        while board.winner == EMPTY and board.num_empty_points() > 0:
+            board.play_move(board.random_empty_point(), board.current_player)
+            moves += 1
+        for _ in range(moves):
+            board.undo()
+    return play
+
+
+def random_playout(size: int, seed: int = 0) -> Callable[[], None]:
+    """
+    The same game as random_game, played with GoBoard.random_playout,
+    which skips the undo records and indexes of play_move
+    """
+    board = GoBoard(size)
+
+    def play() -> None:
+        np.random.seed(seed)
+        board.random_playout()
+    return play
+
+
+def run_benchmarks(sizes: List[int], fills: List[float],
+                   name_filter: str = "", repeats: int = NUM_REPEATS,
+                   verbose: bool = True) -> Dict[str, float]:
+    """
+    Time every benchmark, in seconds per call, keyed by name.
+    The repeats of all benchmarks are interleaved, so that a period
+    when the machine is slower affects one repeat of every benchmark
+    rather than all repeats of some, and the best time of each is kept.
+    """
+    cases: List[Tuple[str, Callable[[], None]]] = []
+    for size in sizes:
+        for fill in fills:
+            board = make_position(size, fill)
+            for benchmarks in (board_benchmarks(board),
+                               gtp_benchmarks(board)):
+                for name, fn in benchmarks.items():
+                    cases.append(
+                        ("{}/{}/{:.2f}".format(name, size, fill), fn))
+        cases.append(("random_game/{}/0.00".format(size), random_game(size)))
+        cases.append(("random_playout/{}/0.00".format(size),
+                      random_playout(size)))
+    cases = [(key, fn) for key, fn in cases if name_filter in key]
+    numbers = [calls_per_repeat(fn) for _, fn in cases]
+    results: Dict[str, float] = {key: float("inf") for key, _ in cases}
+    for _ in range(repeats):
+        for (key, fn), number in zip(cases, numbers):
+            results[key] = min(results[key], time_calls(fn, number))
+    if verbose:
+        for key, _ in cases:
+            print("{:45s} {:12.2f} us".format(key, results[key] * 1e6))
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> List[str]:
+    """
+    Print the change of each benchmark against the baseline,
+    and return the keys of the regressions
+    """
+    regressions: List[str] = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        ratio = results[key] / baseline[key]
+        mark = ""
+        if ratio > 1.0 + threshold:
+            mark = "REGRESSION"
+            regressions.append(key)
+        elif ratio < 1.0 - threshold:
+            mark = "faster"
+        print("{:45s} {:7.2f}x {}".format(key, ratio, mark))
+    return regressions
+
+
+def load_results(path: str) -> Dict[str, float]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_results(path: str, results: Dict[str, float]) -> None:
+    data = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "unit": "seconds per call",
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the board and GTP hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=BENCHMARK_SIZES)
+    parser.add_argument("--fills", type=float, nargs="+",
+                        default=BENCHMARK_FILLS,
+                        help="fractions of the board covered by stones")
+    parser.add_argument("--filter", default="",
+                        help="only run benchmarks whose key contains this")
+    parser.add_argument("--repeats", type=int, default=NUM_REPEATS)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None,
+                        help="JSON file of earlier results to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+    results = run_benchmarks(args.sizes, args.fills, args.filter,
+                             args.repeats)
+    if args.output is not None:
+        save_results(args.output, results)
+    if args.baseline is not None:
+        regressions = compare(results, load_results(args.baseline),
+                              args.threshold)
+        if regressions:
+            print("{} regressions".format(len(regressions)))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
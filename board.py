@@ -26,11 +26,23 @@ from board_base import (
     EMPTY,
     BORDER,
     MAXSIZE,
+    CAPTURES_TO_WIN,
+    DEFAULT_CANDIDATE_RADIUS,
     NO_POINT,
     PASS,
     GO_COLOR,
     GO_POINT,
 )
+from point_set import PointSet
+from zobrist import zobrist_keys, symmetric_stone_keys, ZobristKeys
+from board_tables import (
+    board_tables,
+    direction_offsets,
+    BoardTables,
+    NUM_SYMMETRIES,
+)
+from threat_index import ThreatIndex
+from capture_index import CaptureIndex
 
 
 """
@@ -45,11 +57,15 @@ See coord_to_point for explanations of the array encoding.
 
 
 class GoBoard(object):
-    def __init__(self, size: int) -> None:
+    def __init__(self, size: int,
+                 candidate_radius: int = DEFAULT_CANDIDATE_RADIUS) -> None:
         """
-        Creates a Go board of given size
+        Creates a Go board of given size.
+        candidate_radius is used by get_candidate_moves.
         """
         assert 2 <= size <= MAXSIZE
+        assert candidate_radius >= 1
+        self.candidate_radius: int = candidate_radius
         self.reset(size)
 
     def reset(self, size: int) -> None:
@@ -63,23 +79,79 @@ class GoBoard(object):
         self.last_move: GO_POINT = NO_POINT
         self.last2_move: GO_POINT = NO_POINT
         self.current_player: GO_COLOR = BLACK
+        self.winner: GO_COLOR = EMPTY
+        # Number of stones captured by each color, indexed by color
+        self.captures: List[int] = [0, 0, 0]
         self.maxpoint: int = board_array_size(size)
+        self.tables: BoardTables = board_tables(size)
+        self._line_steps: List[int] = direction_offsets(size)[::2]
         self.board: np.ndarray[GO_POINT] = np.full(
             self.maxpoint, BORDER, dtype=GO_POINT)
         self._initialize_empty_points(self.board)
+        self._empty_points: PointSet = PointSet(size * size, self.maxpoint)
+        for point in where1d(self.board == EMPTY):
+            self._empty_points.add(point)
+        # One record per play_move, popped by undo
+        self._undo_stack: List[Tuple] = []
+        # Zobrist hash of the position, updated incrementally
+        self._zobrist: ZobristKeys = zobrist_keys(size)
+        self.hash: int = 0
+        # Stone part of the hash of each symmetric image of the position
+        self._sym_keys: List[List[Tuple[int, ...]]] = \
+            symmetric_stone_keys(size)
+        self._sym_hashes: List[int] = [0] * NUM_SYMMETRIES
+        # Candidate moves: empty points within candidate_radius of a stone.
+        # _near counts the stones within candidate_radius of each point.
+        self._neighborhood: List[List[int]] = \
+            self.tables.neighborhood(self.candidate_radius)
+        self._near: List[int] = [0] * self.maxpoint
+        self._candidates: PointSet = PointSet(size * size, self.maxpoint)
+        # Per-window stone counts, see threat_index.py
+        self.threats: ThreatIndex = ThreatIndex(size)
+        # Capturable pairs and capture points, see capture_index.py
+        self.capture_threats: CaptureIndex = CaptureIndex(size)
 
     def copy(self) -> 'GoBoard':
-        b = GoBoard(self.size)
+        b = type(self)(self.size, self.candidate_radius)
         assert b.NS == self.NS
         assert b.WE == self.WE
         b.ko_recapture = self.ko_recapture
         b.last_move = self.last_move
         b.last2_move = self.last2_move
         b.current_player = self.current_player
+        b.winner = self.winner
+        b.captures = list(self.captures)
+        b.hash = self.hash
+        b._sym_hashes = list(self._sym_hashes)
         assert b.maxpoint == self.maxpoint
         b.board = np.copy(self.board)
+        b._empty_points = self._empty_points.copy()
+        b._undo_stack = list(self._undo_stack)
+        b._near = list(self._near)
+        b._candidates = self._candidates.copy()
+        b.threats = self.threats.copy()
+        b.capture_threats = self.capture_threats.copy()
         return b
 
+    def __getstate__(self) -> dict:
+        """
+        The per-size tables are cached in each process, so they are
+        left out when a board is pickled, e.g. to send it to a worker.
+        """
+        state = self.__dict__.copy()
+        del state["tables"]
+        del state["_zobrist"]
+        del state["_sym_keys"]
+        del state["_neighborhood"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.tables = board_tables(self.size)
+        self._zobrist = zobrist_keys(self.size)
+        self._sym_keys = symmetric_stone_keys(self.size)
+        self._neighborhood = self.tables.neighborhood(self.candidate_radius)
+
     def get_color(self, point: GO_POINT) -> GO_COLOR:
         return self.board[point]
 
@@ -105,19 +177,21 @@ class GoBoard(object):
             return False
         if point == self.ko_recapture:
             return False
+        if self.winner != EMPTY:
+            return False
         return True
 
     def is_legal(self, point: GO_POINT, color: GO_COLOR) -> bool:
         """
-        Check whether it is legal for color to play on point
-        This method tries to play the move on a temporary copy of the board.
-        This prevents the board from being modified by the move
+        Check whether it is legal for color to play on point.
+        Ninuki has no suicide rule, so a move is legal exactly when the
+        point is empty, is not the ko point, and the game is not over.
+        These checks are made on the board itself, without playing the
+        move on a copy.
         """
         if point == PASS:
             return True
-        board_copy: GoBoard = self.copy()
-        can_play_move = board_copy.play_move(point, color)
-        return can_play_move
+        return self._is_legal_check_simple_cases(point, color)
 
     def end_of_game(self) -> bool:
         return self.last_move == PASS \
@@ -126,9 +200,104 @@ class GoBoard(object):
     def get_empty_points(self) -> np.ndarray:
         """
         Return:
-            The empty points on the board
+            The empty points on the board, in no particular order
+        """
+        return self._empty_points.to_array()
+
+    def num_empty_points(self) -> int:
+        return len(self._empty_points)
+
+    def random_empty_point(self) -> GO_POINT:
+        """
+        Return a uniformly random empty point, or PASS if the board is full
         """
-        return where1d(self.board == EMPTY)
+        if len(self._empty_points) == 0:
+            return PASS
+        return self._empty_points.random_point()
+
+    def random_playout(self) -> GO_COLOR:
+        """
+        Play uniformly random moves from this position until the game is
+        over, and return the winner, EMPTY for a draw.
+        The moves are played on a list copy of the board array, without
+        the undo records, hashes and indexes kept by play_move, so each
+        move only checks the captures and lines through it.
+        The board is not changed.
+        """
+        if self.winner != EMPTY:
+            return self.winner
+        cells = self.board.tolist()
+        empty = self.get_empty_points().tolist()
+        index = [0] * self.maxpoint
+        for i, point in enumerate(empty):
+            index[point] = i
+        captures = list(self.captures)
+        patterns = self.tables.capture_pattern_lists
+        steps = self._line_steps
+        color = self.current_player
+        randoms: List[float] = []
+        while empty:
+            if not randoms:
+                randoms = np.random.random(len(empty) + 8).tolist()
+            point = empty[int(randoms.pop() * len(empty))]
+            last = empty.pop()
+            if last != point:
+                empty[index[point]] = last
+                index[last] = index[point]
+            cells[point] = color
+            opp = BLACK + WHITE - color
+            for p1, p2, p3 in patterns[point]:
+                if cells[p1] == opp and cells[p2] == opp \
+                        and cells[p3] == color:
+                    cells[p1] = cells[p2] = EMPTY
+                    index[p1] = len(empty)
+                    empty.append(p1)
+                    index[p2] = len(empty)
+                    empty.append(p2)
+                    captures[color] += 2
+            if captures[color] >= CAPTURES_TO_WIN:
+                return color
+            for step in steps:
+                count = 1
+                p = point + step
+                while cells[p] == color:
+                    count += 1
+                    p += step
+                p = point - step
+                while cells[p] == color:
+                    count += 1
+                    p -= step
+                if count >= 5:
+                    return color
+            color = opp
+        return EMPTY
+
+    def set_candidate_radius(self, radius: int) -> None:
+        """
+        Change candidate_radius, and rebuild the candidate moves for it
+        """
+        assert radius >= 1
+        self.candidate_radius = radius
+        self._neighborhood = self.tables.neighborhood(radius)
+        self._near = [0] * self.maxpoint
+        self._candidates = PointSet(self.size * self.size, self.maxpoint)
+        for stone in where1d((self.board == BLACK) | (self.board == WHITE)):
+            for nb in self._neighborhood[stone]:
+                self._near[nb] += 1
+        for point in self.get_empty_points():
+            if self._near[point] > 0:
+                self._candidates.add(point)
+
+    def get_candidate_moves(self) -> np.ndarray:
+        """
+        Return:
+            The empty points within candidate_radius (Chebyshev distance)
+            of a stone, in no particular order.
+            On a board without stones, all empty points.
+        """
+        if len(self._candidates) == 0:
+            return self.get_empty_points()
+        return self._candidates.to_array()
 
     def row_start(self, row: int) -> int:
         assert row >= 1
@@ -225,7 +394,8 @@ class GoBoard(object):
         opp_block = self._block_of(nb_point)
         if not self._has_liberty(opp_block):
             captures = list(where1d(opp_block))
-            self.board[captures] = EMPTY
+            for stone in captures:
+                self._remove_stone(stone)
             if len(captures) == 1:
                 single_capture = nb_point
         return single_capture
@@ -237,22 +407,205 @@ class GoBoard(object):
         """
         if not self._is_legal_check_simple_cases(point, color):
             return False
-        # Special cases
-        # if point == PASS:
-        #     self.ko_recapture = NO_POINT
-        #     self.current_player = opponent(color)
-        #     self.last2_move = self.last_move
-        #     self.last_move = point
-        #     return True
-
-        # General case: deal with captures, suicide, and next ko point
-
-        self.board[point] = color
-        self.current_player = opponent(color)
+        ko_recapture = self.ko_recapture
+        last_move = self.last_move
+        last2_move = self.last2_move
+        current_player = self.current_player
+        winner = self.winner
+        prev_hash = self.hash
+        self._set_current_player(opponent(color))
+        self.ko_recapture = NO_POINT
         self.last2_move = self.last_move
         self.last_move = point
+        # Special cases
+        if point == PASS:
+            captured: List[GO_POINT] = []
+        else:
+            # General case: place the stone, remove captured pairs,
+            # and check for five in a row or enough captures to win
+            self._set_stone(point, color)
+            captured = self._find_captures(point, color)
+            if captured:
+                for stone in captured:
+                    self._remove_stone(stone)
+                self._set_captures(color, self.captures[color] + len(captured))
+            if self.captures[color] >= CAPTURES_TO_WIN \
+                    or self._makes_five(point, color):
+                self.winner = color
+        self._undo_stack.append((point, captured, ko_recapture, last_move,
+                                 last2_move, current_player, winner,
+                                 prev_hash))
         return True
 
+    def undo(self) -> None:
+        """
+        Take back the last move made by play_move, including its captures.
+        Restores the board to exactly the state before that move,
+        without allocating a new board.
+        """
+        assert self._undo_stack
+        point, captured, self.ko_recapture, self.last_move, \
+            self.last2_move, self.current_player, self.winner, \
+            prev_hash = self._undo_stack.pop()
+        if point != PASS:
+            color: GO_COLOR = self.board[point]
+            self._remove_stone(point)
+            if captured:
+                opp = opponent(color)
+                for stone in captured:
+                    self._set_stone(stone, opp)
+                self._set_captures(color,
+                                   self.captures[color] - len(captured))
+        self.hash = prev_hash
+
+    def _find_captures(self, point: GO_POINT,
+                       color: GO_COLOR) -> List[GO_POINT]:
+        """
+        Return the stones captured by a stone of color on point:
+        the pairs O O in each X O O X pattern that starts at point.
+        Only the 8 precomputed patterns through point are checked.
+        """
+        board = self.board
+        opp = opponent(color)
+        captured: List[GO_POINT] = []
+        for p1, p2, p3 in self.tables.capture_pattern_lists[point]:
+            if board[p1] == opp and board[p2] == opp and board[p3] == color:
+                captured.append(p1)
+                captured.append(p2)
+        return captured
+
+    def _set_captures(self, color: GO_COLOR, count: int) -> None:
+        keys = self._zobrist.captures[color]
+        self.hash ^= keys[self.captures[color]] ^ keys[count]
+        self.captures[color] = count
+
+    def get_captures(self, color: GO_COLOR) -> int:
+        """ The number of stones captured by color """
+        return self.captures[color]
+
+    def winning_moves(self, color: GO_COLOR) -> List[GO_POINT]:
+        """
+        The empty points where color wins at once, by making five in a
+        row or by capturing enough stones to reach CAPTURES_TO_WIN
+        """
+        wins = self.threats.winning_moves(color)
+        for point in self.capture_threats.capture_winning_moves(
+                color, self.captures[color]):
+            if point not in wins:
+                wins.append(point)
+        return wins
+
+    def has_winning_move(self, color: GO_COLOR) -> bool:
+        return self.threats.has_winning_move(color) or \
+            len(self.capture_threats.capture_winning_moves(
+                color, self.captures[color])) > 0
+
+    def forced_blocks(self, color: GO_COLOR) -> List[GO_POINT]:
+        """
+        If the opponent has an immediate win, the moves for color that
+        may stop it: the opponent's winning points, and the captures of
+        color, which can break up a four or a pair. Otherwise empty.
+        """
+        blocks = self.winning_moves(opponent(color))
+        if not blocks:
+            return blocks
+        for point in self.capture_threats.capture_moves(color):
+            if point not in blocks:
+                blocks.append(point)
+        return blocks
+
+    def _set_current_player(self, color: GO_COLOR) -> None:
+        if color != self.current_player:
+            self.hash ^= self._zobrist.side
+            self.current_player = color
+
+    def _set_stone(self, point: GO_POINT, color: GO_COLOR) -> None:
+        """
+        Put a stone of color on the empty point.
+        All changes of the board array go through _set_stone and
+        _remove_stone, so that the incremental data stays in sync.
+        """
+        self.board[point] = color
+        self._empty_points.remove(point)
+        self.hash ^= self._zobrist.stones[color][point]
+        self._update_sym_hashes(point, color)
+        if point in self._candidates:
+            self._candidates.remove(point)
+        near = self._near
+        for nb in self._neighborhood[point]:
+            near[nb] += 1
+            if near[nb] == 1 and self.board[nb] == EMPTY:
+                self._candidates.add(nb)
+        self.threats.add_stone(point, color, self.board)
+        self.capture_threats.update(point, self.board)
+
+    def _remove_stone(self, point: GO_POINT) -> None:
+        """ Remove the stone on point, making it empty """
+        color: GO_COLOR = self.board[point]
+        self.hash ^= self._zobrist.stones[color][point]
+        self._update_sym_hashes(point, color)
+        self.board[point] = EMPTY
+        self._empty_points.add(point)
+        near = self._near
+        for nb in self._neighborhood[point]:
+            near[nb] -= 1
+            if near[nb] == 0 and self.board[nb] == EMPTY:
+                self._candidates.remove(nb)
+        if near[point] > 0:
+            self._candidates.add(point)
+        self.threats.remove_stone(point, color, self.board)
+        self.capture_threats.update(point, self.board)
+
+    def _update_sym_hashes(self, point: GO_POINT, color: GO_COLOR) -> None:
+        """ Add or remove a stone of color on point in each image """
+        h = self._sym_hashes
+        keys = self._sym_keys[color][point]
+        for k in range(NUM_SYMMETRIES):
+            h[k] ^= keys[k]
+
+    def canonical_symmetry(self) -> int:
+        """
+        The symmetry that maps the position to its canonical form:
+        the image with the smallest stone hash.
+        The other parts of the hash are the same in all images.
+        """
+        h = self._sym_hashes
+        return min(range(NUM_SYMMETRIES), key=h.__getitem__)
+
+    def symmetric_hash(self, k: int) -> int:
+        """ The hash of the image of the position under symmetry k """
+        return self.hash ^ self._sym_hashes[0] ^ self._sym_hashes[k]
+
+    def canonical_hash(self) -> int:
+        """
+        The hash of the canonical form of the position, the same for
+        all 8 rotations and mirror images of it.
+        Use canonical_symmetry and tables.symmetries to map a move
+        into the canonical frame, and tables.inverse_symmetries to
+        map it back.
+        """
+        return self.symmetric_hash(self.canonical_symmetry())
+
+    def _makes_five(self, point: GO_POINT, color: GO_COLOR) -> bool:
+        """
+        Check whether the stone of color on point is part of five or more
+        in a row. Only the four lines through point are examined, so
+        the cost does not depend on the board size.
+        """
+        for step in self._line_steps:
+            count = 1
+            p = point + step
+            while self.board[p] == color:
+                count += 1
+                p += step
+            p = point - step
+            while self.board[p] == color:
+                count += 1
+                p -= step
+            if count >= 5:
+                return True
+        return False
+
     def neighbors_of_color(self, point: GO_POINT, color: GO_COLOR) -> List:
         """ List of neighbors of point of given color """
         nbc: List[GO_POINT] = []
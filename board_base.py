@@ -51,6 +51,17 @@ GtpConnection.format_point needs to be changed.
 MAXSIZE: int = 25
 DEFAULT_SIZE: int = 7
 
+"""
+Ninuki: a player who has captured this many stones wins the game.
+"""
+CAPTURES_TO_WIN: int = 10
+
+"""
+Default Chebyshev distance from the nearest stone for candidate moves.
+See GoBoard.get_candidate_moves.
+"""
+DEFAULT_CANDIDATE_RADIUS: int = 2
+
 """
 The number of array elements in a "padded 1D" representation 
 of a size x size board.
@@ -0,0 +1,134 @@
+"""
+board_batch.py
+A batch of Ninuki games played in lockstep with numpy array operations.
+
+The B games are stored as one 2D array of shape (B, maxpoint), where
+each row uses the padded 1D layout of board_base.coord_to_point.
+Each step takes one move per game. Stone placement, pair captures and
+five-in-a-row detection are done for all games at once, using the
+geometry in board_tables, so there is no Python loop over games.
+This is meant for running many random playouts per genmove.
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+from board import GoBoard
+from board_base import (
+    board_array_size,
+    BLACK,
+    WHITE,
+    EMPTY,
+    CAPTURES_TO_WIN,
+    GO_COLOR,
+    GO_POINT,
+    PASS,
+)
+from board_tables import board_tables, BoardTables
+
+
+class BoardBatch(object):
+    def __init__(self, size: int, batch_size: int) -> None:
+        """
+        Create batch_size games, each on an empty board of given size
+        """
+        self.size: int = size
+        self.batch_size: int = batch_size
+        self.maxpoint: int = board_array_size(size)
+        self.tables: BoardTables = board_tables(size)
+        empty_board = GoBoard(size).board.astype(np.int8)
+        self.boards: np.ndarray = np.tile(empty_board, (batch_size, 1))
+        self.current_player: np.ndarray = np.full(
+            batch_size, BLACK, dtype=np.int8)
+        # captures[g, color] is the number of stones captured by color
+        self.captures: np.ndarray = np.zeros((batch_size, 3), dtype=np.int32)
+        self.num_empty: np.ndarray = np.full(
+            batch_size, size * size, dtype=np.int32)
+        self.winner: np.ndarray = np.full(batch_size, EMPTY, dtype=np.int8)
+        self.done: np.ndarray = np.zeros(batch_size, dtype=np.bool_)
+
+    @classmethod
+    def from_board(cls, board: GoBoard, batch_size: int) -> 'BoardBatch':
+        """
+        Create batch_size copies of the position on board
+        """
+        batch = cls(board.size, batch_size)
+        batch.boards[:] = board.board.astype(np.int8)
+        batch.current_player[:] = board.current_player
+        batch.captures[:, BLACK] = board.get_captures(BLACK)
+        batch.captures[:, WHITE] = board.get_captures(WHITE)
+        batch.num_empty[:] = board.num_empty_points()
+        batch.winner[:] = board.winner
+        batch.done[:] = board.winner != EMPTY \
+            or board.num_empty_points() == 0
+        return batch
+
+    def play_moves(self, moves: np.ndarray) -> np.ndarray:
+        """
+        Play moves[g] for the player to move in each game g.
+        Games that are over, and games with move PASS, are left unchanged.
+        Each other move must be on an empty point.
+        Returns the array of which games are over.
+        """
+        games = np.nonzero(~self.done & (moves != PASS))[0]
+        if len(games) == 0:
+            return self.done
+        points = moves[games]
+        colors = self.current_player[games]
+        assert np.all(self.boards[games, points] == EMPTY)
+        self.boards[games, points] = colors
+
+        # Pair captures: X O O X patterns starting at the new stone
+        patterns = self.tables.capture_patterns[points]
+        cells = self.boards[games[:, None, None], patterns]
+        own = colors[:, None]
+        opp = (BLACK + WHITE - colors)[:, None]
+        captured = (cells[:, :, 0] == opp) & (cells[:, :, 1] == opp) \
+            & (cells[:, :, 2] == own)
+        g, d = np.nonzero(captured)
+        self.boards[games[g], patterns[g, d, 0]] = EMPTY
+        self.boards[games[g], patterns[g, d, 1]] = EMPTY
+        num_captured = 2 * captured.sum(axis=1)
+        self.captures[games, colors] += num_captured
+        self.num_empty[games] += num_captured - 1
+
+        # Five in a row through the new stone
+        windows = self.tables.windows[self.tables.windows_through[points]]
+        window_cells = self.boards[games[:, None, None], windows]
+        five = np.all(window_cells == colors[:, None, None], axis=2) \
+            .any(axis=1)
+        won = five | (self.captures[games, colors] >= CAPTURES_TO_WIN)
+        self.winner[games[won]] = colors[won]
+        self.done[games] = won | (self.num_empty[games] == 0)
+        self.current_player[games] = BLACK + WHITE - colors
+        return self.done
+
+    def random_moves(self) -> np.ndarray:
+        """
+        Return a uniformly random empty point for each game,
+        and PASS for games that are over.
+        """
+        keys = np.random.random(self.boards.shape)
+        keys[self.boards != EMPTY] = -1.0
+        moves = np.argmax(keys, axis=1).astype(GO_POINT)
+        moves[self.done] = PASS
+        return moves
+
+    def play_random_games(self, deadline: Optional[float] = None) -> np.ndarray:
+        """
+        Play uniformly random moves in all games until every game is over,
+        or until time.time() reaches deadline. Games stopped by the
+        deadline are not done, see the done array.
+        Returns the winner of each game, EMPTY for a draw.
+        """
+        while not np.all(self.done):
+            if deadline is not None and time.time() >= deadline:
+                break
+            self.play_moves(self.random_moves())
+        return self.winner
+
+    def wins(self, color: GO_COLOR) -> int:
+        """ The number of games won by color """
+        return int(np.count_nonzero(self.winner == color))
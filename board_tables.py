@@ -0,0 +1,209 @@
+"""
+board_tables.py
+Precomputed geometry tables for the padded 1D board representation.
+See board_base.coord_to_point for the array encoding.
+
+The tables are built once per board size and cached, so code that
+needs lines, rays or capture patterns indexes into numpy arrays
+instead of recomputing coordinates in Python loops.
+
+Padding entries in the tables use point 0, which is always a BORDER
+point. Looking up a padding entry in a board array therefore gives
+BORDER, which never matches a stone color.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from board_base import (
+    board_array_size,
+    coord_to_point,
+    GO_POINT,
+)
+
+"""
+Number of stones in a row needed to win.
+"""
+WIN_LENGTH: int = 5
+
+"""
+Number of symmetries of the square board: 4 rotations, each of them
+with or without a mirror image.
+"""
+NUM_SYMMETRIES: int = 8
+
+"""
+Padding value used in all point tables.
+"""
+PAD_POINT: GO_POINT = GO_POINT(0)
+
+
+def direction_offsets(size: int) -> List[int]:
+    """
+    The array offsets of the 8 directions on a board of given size.
+    Directions come in opposite pairs: direction 2k + 1 is the
+    opposite of direction 2k. The first offset of each pair,
+    directions 0, 2, 4, 6, gives the 4 line directions.
+    """
+    NS = size + 1
+    return [1, -1, NS, -NS, NS + 1, -NS - 1, NS - 1, -NS + 1]
+
+
+class BoardTables(object):
+    """
+    Tables for one board size:
+
+    directions: (8,) array offsets, see direction_offsets
+    rays: (maxpoint, 8, size - 1) the points reached from a point by
+        walking in each direction, nearest first, padded
+    ray_lengths: (maxpoint, 8) the number of real points in each ray
+    windows: (num_windows + 1, 5) every line of 5 points on the board.
+        The last row is a padding window of PAD_POINT.
+    windows_through: (maxpoint, max_windows) the indices of the windows
+        that contain a point, padded with the padding window
+    window_lists, windows_through_lists: windows and windows_through
+        as unpadded lists of Python ints
+    capture_patterns: (maxpoint, 8, 3) for a stone on a point, the three
+        points of the pattern X O O X in each direction, padded.
+        The stone on the point is the first X.
+    capture_pattern_lists: the same patterns as lists of tuples of
+        Python ints, without padding
+    segment_lists: every line of 4 points on the board
+    segments_through_lists: the indices of the segments through each point
+    symmetries: (8, maxpoint) the image of each point under the 8
+        symmetries of the square board. Symmetry 0 is the identity.
+        Points off the board are mapped to themselves.
+    inverse_symmetries: (8, maxpoint) the inverse of each symmetry
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.maxpoint: int = board_array_size(size)
+        offsets = direction_offsets(size)
+        self.directions: np.ndarray = np.array(offsets, dtype=GO_POINT)
+        on_board = np.zeros(self.maxpoint, dtype=np.bool_)
+        points: List[int] = [coord_to_point(row, col, size)
+                             for row in range(1, size + 1)
+                             for col in range(1, size + 1)]
+        on_board[points] = True
+        self.points: np.ndarray = np.array(points, dtype=GO_POINT)
+
+        ray_size = max(size - 1, 1)
+        self.rays: np.ndarray = np.full(
+            (self.maxpoint, 8, ray_size), PAD_POINT, dtype=GO_POINT)
+        self.ray_lengths: np.ndarray = np.zeros(
+            (self.maxpoint, 8), dtype=GO_POINT)
+        for p in points:
+            for d, offset in enumerate(offsets):
+                n = 0
+                q = p + offset
+                while 0 <= q < self.maxpoint and on_board[q]:
+                    self.rays[p, d, n] = q
+                    n += 1
+                    q += offset
+                self.ray_lengths[p, d] = n
+
+        windows: List[List[int]] = []
+        for p in points:
+            for d in (0, 2, 4, 6):
+                if self.ray_lengths[p, d] >= WIN_LENGTH - 1:
+                    windows.append(
+                        [p] + list(self.rays[p, d, :WIN_LENGTH - 1]))
+        self.num_windows: int = len(windows)
+        windows.append([PAD_POINT] * WIN_LENGTH)
+        self.windows: np.ndarray = np.array(windows, dtype=GO_POINT)
+
+        through: List[List[int]] = [[] for _ in range(self.maxpoint)]
+        for w in range(self.num_windows):
+            for p in self.windows[w]:
+                through[p].append(w)
+        max_through = max(1, max(len(t) for t in through))
+        self.windows_through: np.ndarray = np.full(
+            (self.maxpoint, max_through), self.num_windows, dtype=GO_POINT)
+        for p, t in enumerate(through):
+            self.windows_through[p, :len(t)] = t
+        # The same as Python lists, for code that walks them one by one
+        self.window_lists: List[List[int]] = \
+            [[int(p) for p in w] for w in self.windows[:self.num_windows]]
+        self.windows_through_lists: List[List[int]] = through
+
+        self.capture_patterns: np.ndarray = np.full(
+            (self.maxpoint, 8, 3), PAD_POINT, dtype=GO_POINT)
+        for p in points:
+            for d in range(8):
+                if self.ray_lengths[p, d] >= 3:
+                    self.capture_patterns[p, d] = self.rays[p, d, :3]
+        # Every line of 4 points, as used by pair captures X O O X,
+        # and the indices of the segments through each point
+        self.segment_lists: List[Tuple[int, int, int, int]] = []
+        self.segments_through_lists: List[List[int]] = \
+            [[] for _ in range(self.maxpoint)]
+        for p in points:
+            for d in (0, 2, 4, 6):
+                if self.ray_lengths[p, d] >= 3:
+                    segment = (int(p),) + tuple(
+                        int(q) for q in self.rays[p, d, :3])
+                    for q in segment:
+                        self.segments_through_lists[q].append(
+                            len(self.segment_lists))
+                    self.segment_lists.append(segment)
+        # For each point, the patterns that fit on the board, as tuples
+        self.capture_pattern_lists: List[List[Tuple[int, int, int]]] = \
+            [[] for _ in range(self.maxpoint)]
+        for p in points:
+            for d in range(8):
+                if self.ray_lengths[p, d] >= 3:
+                    p1, p2, p3 = (int(q) for q in self.rays[p, d, :3])
+                    self.capture_pattern_lists[p].append((p1, p2, p3))
+
+        # The 4 rotations of the board, each without and with a mirror
+        self.symmetries: np.ndarray = np.tile(
+            np.arange(self.maxpoint, dtype=GO_POINT), (NUM_SYMMETRIES, 1))
+        self.inverse_symmetries: np.ndarray = np.copy(self.symmetries)
+        last = size + 1
+        for row in range(1, size + 1):
+            for col in range(1, size + 1):
+                p = coord_to_point(row, col, size)
+                images = [(row, col), (col, last - row),
+                          (last - row, last - col), (last - col, row),
+                          (row, last - col), (col, row),
+                          (last - row, col), (last - col, last - row)]
+                for k, (r, c) in enumerate(images):
+                    q = coord_to_point(r, c, size)
+                    self.symmetries[k, p] = q
+                    self.inverse_symmetries[k, q] = p
+
+        self._neighborhoods: Dict[int, List[List[int]]] = {}
+
+    def neighborhood(self, radius: int) -> List[List[int]]:
+        """
+        For each point on the board, the list of the other points on
+        the board within Chebyshev distance radius. Lists of Python ints
+        are used since they are walked one point at a time.
+        The result is computed once per radius.
+        """
+        if radius not in self._neighborhoods:
+            result: List[List[int]] = [[] for _ in range(self.maxpoint)]
+            NS = self.size + 1
+            for p in self.points:
+                row, col = divmod(int(p), NS)
+                for r in range(max(1, row - radius),
+                               min(self.size, row + radius) + 1):
+                    for c in range(max(1, col - radius),
+                                   min(self.size, col + radius) + 1):
+                        if r != row or c != col:
+                            result[p].append(r * NS + c)
+            self._neighborhoods[radius] = result
+        return self._neighborhoods[radius]
+
+    def ray(self, point: GO_POINT, d: int) -> np.ndarray:
+        """ The points of the ray from point in direction d """
+        return self.rays[point, d, :self.ray_lengths[point, d]]
+
+
+@lru_cache(maxsize=None)
+def board_tables(size: int) -> BoardTables:
+    """ Return the tables for the given board size, built once """
+    return BoardTables(size)
@@ -32,6 +32,24 @@ class GoBoardUtil(object):
                 legal_moves.append(move)
         return legal_moves
 
+    @staticmethod
+    def generate_candidate_moves(board: GoBoard, color: GO_COLOR) -> List:
+        """
+        generate a list of the legal moves near existing stones,
+        see GoBoard.get_candidate_moves.
+        Meant to cut the branching factor of search and playouts;
+        use generate_legal_moves for the full list.
+
+        Arguments
+        ---------
+        board:
+            a GoBoard
+        color:
+            the color to generate the move for.
+        """
+        return [move for move in board.get_candidate_moves()
+                if board.is_legal(move, color)]
+
     @staticmethod
     def generate_random_move(board: GoBoard, color: GO_COLOR, 
                              use_eye_filter: bool) -> GO_POINT:
@@ -46,6 +64,14 @@ class GoBoardUtil(object):
         color : BLACK, WHITE
             the color to generate the move for.
         """
+        # Try one uniformly sampled point first; this almost always
+        # succeeds and avoids building the list of all empty points.
+        move: GO_POINT = board.random_empty_point()
+        if move == PASS:
+            return PASS
+        if not (use_eye_filter and board.is_eye(move, color)) \
+                and board.is_legal(move, color):
+            return move
         moves: np.ndarray[GO_POINT] = board.get_empty_points()
         np.random.shuffle(moves)
         for move in moves:
@@ -0,0 +1,133 @@
+"""
+capture_index.py
+Incremental index of the pair captures available on a GoBoard.
+This file is imported by board.py.
+
+A pair of stones O O is capturable if it lies on a line of 4 points
+X O O _, with a stone X of the opponent at one end and an empty point
+at the other. Playing X on the empty point captures the pair.
+The index keeps the state of every line of 4 points (see the segments
+in board_tables), and from it:
+- for each color, the points where that color captures, with the
+  number of pairs captured there
+- for each color, the segments holding a pair of that color that can
+  be captured right now
+Playing or removing a stone re-evaluates only the at most 16 segments
+through its point.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from board_base import (
+    EMPTY,
+    GO_COLOR,
+    GO_POINT,
+    CAPTURES_TO_WIN,
+    is_black_white,
+    opponent,
+)
+from board_tables import board_tables
+
+"""
+The state of a segment that holds a capturable pair:
+(color of the capturing player, point where the capture is made)
+"""
+CaptureState = Tuple[GO_COLOR, int]
+
+
+class CaptureIndex(object):
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        tables = board_tables(size)
+        self._segments: List[Tuple[int, int, int, int]] = \
+            tables.segment_lists
+        self._through: List[List[int]] = tables.segments_through_lists
+        self.states: List[Optional[CaptureState]] = \
+            [None] * len(self._segments)
+        # Indexed by the capturing color: EMPTY, BLACK, WHITE
+        self.capture_points: List[Dict[int, int]] = [{}, {}, {}]
+        self.active: List[Set[int]] = [set(), set(), set()]
+
+    def copy(self) -> 'CaptureIndex':
+        c = CaptureIndex.__new__(CaptureIndex)
+        c.size = self.size
+        c._segments = self._segments
+        c._through = self._through
+        c.states = list(self.states)
+        c.capture_points = [dict(points) for points in self.capture_points]
+        c.active = [set(segments) for segments in self.active]
+        return c
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_segments"]
+        del state["_through"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        tables = board_tables(self.size)
+        self._segments = tables.segment_lists
+        self._through = tables.segments_through_lists
+
+    def _evaluate(self, s: int, board: np.ndarray) -> Optional[CaptureState]:
+        a, b, c, d = self._segments[s]
+        pair = board[b]
+        if not is_black_white(pair) or board[c] != pair:
+            return None
+        attacker = opponent(pair)
+        if board[a] == attacker and board[d] == EMPTY:
+            return (attacker, d)
+        if board[d] == attacker and board[a] == EMPTY:
+            return (attacker, a)
+        return None
+
+    def update(self, point: GO_POINT, board: np.ndarray) -> None:
+        """
+        Update the index after the stone on point was added or removed.
+        board is the board array after the change.
+        """
+        states = self.states
+        for s in self._through[point]:
+            old = states[s]
+            new = self._evaluate(s, board)
+            if old == new:
+                continue
+            if old is not None:
+                color, p = old
+                points = self.capture_points[color]
+                if points[p] == 1:
+                    del points[p]
+                else:
+                    points[p] -= 1
+                self.active[color].discard(s)
+            if new is not None:
+                color, p = new
+                points = self.capture_points[color]
+                points[p] = points.get(p, 0) + 1
+                self.active[color].add(s)
+            states[s] = new
+
+    def capture_moves(self, color: GO_COLOR) -> List[GO_POINT]:
+        """ The points where color would capture at least one pair """
+        return [GO_POINT(p) for p in self.capture_points[color]]
+
+    def num_captured_at(self, color: GO_COLOR, point: GO_POINT) -> int:
+        """ The number of stones color would capture by playing point """
+        return 2 * self.capture_points[color].get(int(point), 0)
+
+    def capturable_pairs(self, color: GO_COLOR) -> List[Tuple[int, int]]:
+        """ The pairs of stones of color the opponent can capture now """
+        return [self._segments[s][1:3] for s in self.active[opponent(color)]]
+
+    def capture_winning_moves(self, color: GO_COLOR,
+                              captured: int) -> List[GO_POINT]:
+        """
+        The points where color, having captured stones already,
+        would reach CAPTURES_TO_WIN by capturing
+        """
+        needed = CAPTURES_TO_WIN - captured
+        return [GO_POINT(p) for p, n in self.capture_points[color].items()
+                if 2 * n >= needed]
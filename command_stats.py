@@ -0,0 +1,117 @@
+"""
+command_stats.py
+Low-overhead latency statistics for GTP commands.
+This file is imported by gtp_connection.py.
+
+A LatencyHistogram counts durations in fixed logarithmic buckets, kept
+in a numpy array: BUCKETS_PER_DECADE buckets for each factor of 10
+from MIN_LATENCY to MAX_LATENCY seconds. Recording a duration is one
+log10 and one array increment. Quantiles are read from the bucket
+counts, so they are exact up to the width of a bucket, about 26%.
+
+CommandStats keeps one histogram of wall time and one of CPU time
+for each command name. GtpConnection records as CPU time that of the
+thread running the command plus that of the worker processes it used.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MIN_LATENCY: float = 1e-6
+MAX_LATENCY: float = 1e3
+BUCKETS_PER_DECADE: int = 10
+LOG_MIN_LATENCY: float = math.log10(MIN_LATENCY)
+
+"""
+Quantiles reported by CommandStats.report
+"""
+REPORT_QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram(object):
+    def __init__(self) -> None:
+        decades = math.log10(MAX_LATENCY / MIN_LATENCY)
+        self.num_buckets: int = int(round(decades * BUCKETS_PER_DECADE)) + 1
+        # Bucket i counts durations up to MIN_LATENCY * 10**(i / B),
+        # the last bucket also counts all longer durations
+        self.counts: np.ndarray = np.zeros(self.num_buckets, dtype=np.int64)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if seconds > MIN_LATENCY:
+            i = math.ceil((math.log10(seconds) - LOG_MIN_LATENCY)
+                          * BUCKETS_PER_DECADE)
+            self.counts[i if i < self.num_buckets else -1] += 1
+        else:
+            self.counts[0] += 1
+
+    def bucket_limit(self, i: int) -> float:
+        """ The largest duration counted in bucket i """
+        return MIN_LATENCY * 10 ** (i / BUCKETS_PER_DECADE)
+
+    def quantile(self, q: float) -> float:
+        """
+        An upper bound of the q quantile of the recorded durations,
+        0 if there are none
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        i = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self.bucket_limit(i), self.max)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def clear(self) -> None:
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class CommandStats(object):
+    def __init__(self) -> None:
+        # Command name -> (wall time histogram, CPU time histogram)
+        self.histograms: Dict[str, Tuple[LatencyHistogram,
+                                         LatencyHistogram]] = {}
+
+    def record(self, name: str, wall: float, cpu: float) -> None:
+        histograms = self.histograms.get(name)
+        if histograms is None:
+            histograms = (LatencyHistogram(), LatencyHistogram())
+            self.histograms[name] = histograms
+        histograms[0].record(wall)
+        histograms[1].record(cpu)
+
+    def clear(self) -> None:
+        self.histograms.clear()
+
+    def report(self) -> List[str]:
+        """
+        One line per command, the slowest total first:
+        name, count, then wall time mean, quantiles and max,
+        and CPU time mean, all in milliseconds
+        """
+        header = "command count wall_mean {} wall_max cpu_mean".format(
+            " ".join("wall_p{}".format(int(q * 100))
+                     for q in REPORT_QUANTILES))
+        lines = [header]
+        by_total = sorted(self.histograms.items(),
+                          key=lambda item: item[1][0].total, reverse=True)
+        for name, (wall, cpu) in by_total:
+            values = [wall.mean()] \
+                + [wall.quantile(q) for q in REPORT_QUANTILES] \
+                + [wall.max, cpu.mean()]
+            lines.append("{} {} {}".format(
+                name, wall.count,
+                " ".join("{:.3f}".format(v * 1000) for v in values)))
+        return lines
@@ -1,7 +1,10 @@
+from typing import Dict
+
 from board_base import GO_POINT, NO_POINT
 from board import GoBoard
 
 DEFAULT_KOMI = 6.5
+DEFAULT_TIME_LIMIT = 1.0
 
 class GoEngine:
     def __init__(self, name: str, version: float) -> None:
@@ -12,6 +15,13 @@ class GoEngine:
         self.name: str = name
         self.version: float = version
         self.komi: float = DEFAULT_KOMI
+        # Wall-clock budget in seconds for engines that search
+        self.time_limit: float = DEFAULT_TIME_LIMIT
+        # Whether to search during the opponent's turn, see start_pondering
+        self.ponder: bool = False
+        # CPU seconds used by the worker processes of the engine so far,
+        # added to the CPU time of GTP commands, see GtpConnection
+        self.worker_cpu_time: float = 0.0
 
     def get_move(self, board: GoBoard, color: int) -> GO_POINT:
         """
@@ -19,4 +29,47 @@ class GoEngine:
         version : version number used by the GTP interface
         """
         pass
-        
\ No newline at end of file
+
+    def on_play(self, board: GoBoard, point: GO_POINT, color: int) -> None:
+        """
+        Called by the GTP interface after color played point on board.
+        Engines that keep state between moves update it here.
+        """
+        pass
+
+    def on_reset(self) -> None:
+        """
+        Called by the GTP interface when the board is cleared or resized.
+        """
+        pass
+
+    def start_pondering(self, board: GoBoard) -> None:
+        """
+        Called by the GTP interface after the engine played a move.
+        Engines that support pondering start searching the position on
+        board in the background here, if self.ponder is set.
+        The engine must not change board.
+        """
+        pass
+
+    def stop_pondering(self) -> None:
+        """
+        Called by the GTP interface before the board or the engine state
+        changes. Stops a search started by start_pondering, and waits
+        for it to end.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Called when the GTP session ends. Releases the threads and
+        processes of the engine. Stops pondering by default.
+        """
+        self.stop_pondering()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Statistics about the last search, reported by gogui-engine_stats.
+        Engines that do not search have none.
+        """
+        return {}
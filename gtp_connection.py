@@ -11,8 +11,9 @@ at the University of Edinburgh.
 import traceback
 import numpy as np
 import re
+import time
 from sys import stdin, stdout, stderr
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, Union
 
 from board_base import (
     BLACK,
@@ -21,6 +22,7 @@ from board_base import (
     BORDER,
     GO_COLOR, GO_POINT,
     PASS,
+    NO_POINT,
     MAXSIZE,
     coord_to_point,
     opponent
@@ -28,10 +30,39 @@ from board_base import (
 from board import GoBoard
 from board_util import GoBoardUtil
 from engine import GoEngine
+from solver import AlphaBetaSolver, LazySMPSolver, WIN, LOSS
+from transposition_table import TranspositionTable
+from opening_book import OpeningBook, book_path
+from command_stats import CommandStats
+from time_manager import (
+    TimeManager,
+    NO_TIME,
+    ABSOLUTE,
+    CANADIAN,
+    BYOYOMI,
+)
+
+"""
+Leading command number of regression test lines, e.g. "12 genmove b"
+"""
+COMMAND_NUMBER = re.compile(r"^\d+")
+
+"""
+Maximum number of bytes read from the input at once by start_connection
+"""
+READ_CHUNK_SIZE: int = 65536
+
+"""
+Default log2 of the number of buckets of the solver's transposition
+table, 2 ** 16 buckets take about 2.5 MB. See solver_table_size.
+"""
+SOLVER_TABLE_SIZE_LOG2: int = 16
+MAX_SOLVER_TABLE_SIZE_LOG2: int = 30
 
 
 class GtpConnection:
-    def __init__(self, go_engine: GoEngine, board: GoBoard, debug_mode: bool = False) -> None:
+    def __init__(self, go_engine: GoEngine, board: GoBoard, debug_mode: bool = False,
+                 outfile: Optional[TextIO] = None) -> None:
         """
         Manage a GTP connection for a Go-playing engine
 
@@ -41,12 +72,39 @@ class GtpConnection:
             a program that can reply to a set of GTP commandsbelow
         board: 
             Represents the current board state.
+        outfile:
+            The stream responses are written to, stdout by default.
         """
         self._debug_mode: bool = debug_mode
+        self.outfile: TextIO = outfile if outfile is not None else stdout
+        # In pipelined mode, responses are collected in _output and
+        # written out by flush, see start_connection.
+        self.pipelined: bool = False
+        self._output: List[str] = []
         self.go_engine = go_engine
         self.board: GoBoard = board
 
-        self.capture: List = [0, 0]
+        # Created by the first gogui-solve, see get_solver
+        self.solver: Optional[Union[AlphaBetaSolver, LazySMPSolver]] = None
+        self.solver_table_size_log2: int = SOLVER_TABLE_SIZE_LOG2
+        self.solver_workers: int = 1
+        # Opening books by board size, opened on first use.
+        # genmove plays the book move if there is one.
+        self.use_book: bool = True
+        self._books: Dict[int, OpeningBook] = {}
+        # Gives the engine's time_limit for each genmove once a time
+        # system is set by time_settings or kgs-time_settings
+        self.time_manager: TimeManager = TimeManager()
+        # CPU seconds used by the workers of closed solvers
+        self._closed_solver_cpu_time: float = 0.0
+        # Wall and CPU time of every command, see gogui-stats.
+        # The CPU time is that of the thread running the command plus
+        # that of the worker processes of the engine and the solver.
+        # If stats_interval > 0, the stats are also written to stderr
+        # every stats_interval seconds.
+        self.stats: CommandStats = CommandStats()
+        self.stats_interval: float = 0.0
+        self._last_stats_dump: float = time.time()
 
         self.commands: Dict[str, Callable[[List[str]], None]] = {
             "protocol_version": self.protocol_version_cmd,
@@ -64,7 +122,7 @@ class GtpConnection:
             "legal_moves": self.legal_moves_cmd,
             "gogui-rules_legal_moves": self.gogui_rules_legal_moves_cmd,
             "gogui-rules_final_result": self.gogui_rules_final_result_cmd,
-            # "gogui-rules_captured_count": self.gogui_rules_captured_count_cmd,
+            "gogui-rules_captured_count": self.gogui_rules_captured_count_cmd,
             "gogui-rules_game_id": self.gogui_rules_game_id_cmd,
             "gogui-rules_board_size": self.gogui_rules_board_size_cmd,
             "gogui-rules_side_to_move": self.gogui_rules_side_to_move_cmd,
@@ -73,8 +131,18 @@ class GtpConnection:
             "gogui-captured_check_commands": self.gogui_captured_check_cmd,
             "gogui-rules_legal_moves_cmd": self.gogui_rules_legal_moves_cmd_return,
             "gogui-test": self.gogui_test_cmd,
-            "gogui-check_neighbors": self.gogui_check_neighbors_cmd
-
+            "gogui-check_neighbors": self.gogui_check_neighbors_cmd,
+            "timelimit": self.timelimit_cmd,
+            "ponder": self.ponder_cmd,
+            "time_settings": self.time_settings_cmd,
+            "time_left": self.time_left_cmd,
+            "kgs-time_settings": self.kgs_time_settings_cmd,
+            "gogui-engine_stats": self.gogui_engine_stats_cmd,
+            "gogui-solve": self.gogui_solve_cmd,
+            "gogui-stats": self.gogui_stats_cmd,
+            "stats_interval": self.stats_interval_cmd,
+            "solver_table_size": self.solver_table_size_cmd,
+            "solver_workers": self.solver_workers_cmd,
         }
 
         # argmap is used for argument checking
@@ -87,23 +155,61 @@ class GtpConnection:
             "genmove": (1, "Usage: genmove {w,b}"),
             "play": (2, "Usage: play {b,w} MOVE"),
             "legal_moves": (1, "Usage: legal_moves {w,b}"),
+            "timelimit": (1, "Usage: timelimit SECONDS"),
+            "ponder": (1, "Usage: ponder {on,off}"),
+            "time_settings": (3, "Usage: time_settings MAIN BYO_YOMI STONES"),
+            "time_left": (3, "Usage: time_left {w,b} TIME STONES"),
+            "stats_interval": (1, "Usage: stats_interval SECONDS"),
+            "solver_table_size": (1, "Usage: solver_table_size LOG2"),
+            "solver_workers": (1, "Usage: solver_workers INT"),
         }
 
     def write(self, data: str) -> None:
-        stdout.write(data)
+        """
+        Send data to the output stream. In pipelined mode, data is
+        only buffered until the next flush.
+        """
+        self._output.append(data)
+        if not self.pipelined:
+            self.flush()
 
     def flush(self) -> None:
-        stdout.flush()
+        """ Write out the buffered responses in one call """
+        if self._output:
+            self.outfile.write("".join(self._output))
+            self._output.clear()
+        self.outfile.flush()
 
     def start_connection(self) -> None:
         """
         Start a GTP connection. 
         This function continuously monitors standard input for commands.
+
+        Input is read in chunks of whatever is available, and all the
+        complete commands in a chunk are run before the responses are
+        flushed. A controller that pipelines many commands, such as a
+        regression test file, so costs one read and one write per chunk
+        instead of per command. Responses are also flushed when a
+        genmove starts, so they are not held back during a search.
         """
-        line = stdin.readline()
-        while line:
-            self.get_cmd(line)
-            line = stdin.readline()
+        self.pipelined = True
+        infile = stdin.buffer
+        pending = b""
+        try:
+            while True:
+                chunk = infile.read1(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    self.get_cmd(line.decode("utf-8", "replace") + "\n")
+                self.flush()
+            if pending:
+                self.get_cmd(pending.decode("utf-8", "replace"))
+        finally:
+            self.flush()
+            self.pipelined = False
 
     def get_cmd(self, command: str) -> None:
         """
@@ -115,7 +221,7 @@ class GtpConnection:
             return
         # Strip leading numbers from regression tests
         if command[0].isdigit():
-            command = re.sub("^\d+", "", command).lstrip()
+            command = COMMAND_NUMBER.sub("", command, 1).lstrip()
 
         elements: List[str] = command.split()
         if not elements:
@@ -125,6 +231,8 @@ class GtpConnection:
         if self.has_arg_error(command_name, len(args)):
             return
         if command_name in self.commands:
+            start = time.perf_counter()
+            cpu_start = time.thread_time() + self.worker_cpu_time()
             try:
                 self.commands[command_name](args)
             except Exception as e:
@@ -132,10 +240,34 @@ class GtpConnection:
                 self.debug_msg("Stack Trace:\n{}\n".format(
                     traceback.format_exc()))
                 raise e
+            finally:
+                self.stats.record(command_name,
+                                  time.perf_counter() - start,
+                                  time.thread_time()
+                                  + self.worker_cpu_time() - cpu_start)
+                if self.stats_interval > 0:
+                    self._dump_stats()
         else:
             self.debug_msg("Unknown command: {}\n".format(command_name))
             self.error("Unknown command")
-            stdout.flush()
+
+    def worker_cpu_time(self) -> float:
+        """
+        CPU seconds used so far by the worker processes of the engine
+        and of the solvers
+        """
+        total = self.go_engine.worker_cpu_time + self._closed_solver_cpu_time
+        if isinstance(self.solver, LazySMPSolver):
+            total += self.solver.worker_cpu_time
+        return total
+
+    def _dump_stats(self) -> None:
+        """ Write the stats to stderr if stats_interval has passed """
+        now = time.time()
+        if now - self._last_stats_dump >= self.stats_interval:
+            self._last_stats_dump = now
+            stderr.write("\n".join(self.stats_lines()) + "\n")
+            stderr.flush()
 
     def has_arg_error(self, cmd: str, argnum: int) -> bool:
         """
@@ -154,20 +286,20 @@ class GtpConnection:
             stderr.flush()
 
     def error(self, error_msg: str) -> None:
-        """ Send error msg to stdout """
-        stdout.write("? {}\n\n".format(error_msg))
-        stdout.flush()
+        """ Send error msg to the output stream """
+        self.write("? {}\n\n".format(error_msg))
 
     def respond(self, response: str = "") -> None:
-        """ Send response to stdout """
-        stdout.write("= {}\n\n".format(response))
-        stdout.flush()
+        """ Send response to the output stream """
+        self.write("= {}\n\n".format(response))
 
     def reset(self, size: int) -> None:
         """
         Reset the board to empty board of given size
         """
+        self.go_engine.stop_pondering()
         self.board.reset(size)
+        self.go_engine.on_reset()
 
     def board2d(self) -> str:
         return str(GoBoardUtil.get_twoD_board(self.board))
@@ -178,7 +310,9 @@ class GtpConnection:
 
     def quit_cmd(self, args: List[str]) -> None:
         """ Quit game and exit the GTP interface """
+        self.go_engine.stop_pondering()
         self.respond()
+        self.flush()
         exit()
 
     def name_cmd(self, args: List[str]) -> None:
@@ -257,7 +391,11 @@ class GtpConnection:
                      "pstring/Final Result/gogui-rules_final_result\n"
                      "pstring/Board Size/gogui-rules_board_size\n"
                      "pstring/Rules GameID/gogui-rules_game_id\n"
+                     "pstring/Captured Count/gogui-rules_captured_count\n"
                      "pstring/Show Board/gogui-rules_board\n"
+                     "pstring/Engine Stats/gogui-engine_stats\n"
+                     "pstring/Solve/gogui-solve\n"
+                     "pstring/Command Stats/gogui-stats\n"
                      )
 
     def gogui_rules_game_id_cmd(self, args: List[str]) -> None:
@@ -302,13 +440,14 @@ class GtpConnection:
     def gogui_rules_final_result_cmd(self, args: List[str]) -> str:
         """ Implement this function for Assignment 1"""
 
-        if self.check_5([]) == "white":
+        five = self.check_5([])
+        if five == "white":
             self.respond("white")
             return "white"
-        elif self.check_5([]) == "black":
+        elif five == "black":
             self.respond("black")
             return "black"
-        elif len(self.board.get_empty_points()) == 0:
+        elif self.board.num_empty_points() == 0:
             self.respond("draw")
             return "draw"
 
@@ -319,164 +458,34 @@ class GtpConnection:
         self.respond(str(args))
 
     def check_5(self, args: List[str]) -> str:
-
-        size = self.board.size
-        starting = 1
-        for row in range(size - 1, -1, -1):
-            start = self.board.row_start(row + 1)+size-1
-            consecutive = 0
-            last = EMPTY
-            for i in range(starting):
-                point = self.board.board[start + i * (size)]
-
-                if point != last:
-                    consecutive = 1
-                    last = point
-                elif point == last:
-                    consecutive += 1
-                if consecutive == 5 and last == WHITE:
-
-                    return "white"
-                elif consecutive == 5 and last == BLACK:
-
-                    return "black"
-            starting += 1
-
-        size = self.board.size
-        start = self.board.row_start(1)+size-2
-        starting = size - 1
-        for col in range(size - 1):
-            consecutive = 0
-            last = EMPTY
-            for i in range(starting):
-                point = self.board.board[start + i * (size)]
-                if point != last:
-                    consecutive = 1
-                    last = point
-                elif point == last:
-                    consecutive += 1
-                if consecutive == 5 and last == WHITE:
-
-                    return "white"
-                elif consecutive == 5 and last == BLACK:
-
-                    return "black"
-            start -= 1
-            starting -= 1
-
-        size = self.board.size
-        starting = 1
-        for row in range(size - 1, -1, -1):
-            start = self.board.row_start(row + 1)
-            consecutive = 0
-            last = EMPTY
-            for i in range(starting):
-                point = self.board.board[start + i * (size+2)]
-                if point != last:
-                    consecutive = 1
-                    last = point
-                elif point == last:
-                    consecutive += 1
-                if consecutive == 5 and last == WHITE:
-
-                    return "white"
-                elif consecutive == 5 and last == BLACK:
-
-                    return "black"
-            starting += 1
-        size = self.board.size
-        start = self.board.row_start(1)+1
-        starting = size-1
-
-        for col in range(size-1):
-            consecutive = 0
-            last = EMPTY
-            for i in range(starting):
-                point = self.board.board[start + i * (size+2)]
-                if point != last:
-                    consecutive = 1
-                    last = point
-                elif point == last:
-                    consecutive += 1
-                if consecutive == 5 and last == WHITE:
-
-                    return "white"
-                elif consecutive == 5 and last == BLACK:
-
-                    return "black"
-            start += 1
-            starting -= 1
-
-        # vertical
-        size = self.board.size
-        start = self.board.row_start(self.board.size)
-
-        for col in range(size):
-            consecutive = 0
-            last = EMPTY
-
-            for i in range(size):
-                point = self.board.board[start - i*(size+1)]
-                if point != last:
-                    consecutive = 1
-                    last = point
-                elif point == last:
-                    consecutive += 1
-                if consecutive == 5 and last == WHITE:
-
-                    return "white"
-
-                elif consecutive == 5 and last == BLACK:
-
-                    return "black"
-            start += 1
-
-        # horizontal
-        size = self.board.size
-        for row in range(size-1, -1, -1):
-            start = self.board.row_start(row + 1)
-            consecutive = 0
-            last = EMPTY
-            for i in range(size):
-                point = self.board.board[start + i]
-                if point != last:
-                    consecutive = 1
-                    last = point
-                elif point == last:
-                    consecutive += 1
-                if consecutive == 5 and last == WHITE:
-                    return "white"
-                elif consecutive == 5 and last == BLACK:
-                    return "black"
-
+        """
+        Return the color that has won, by five in a row or by captures,
+        or "none". The board records the winner in play_move, so this
+        is O(1).
+        """
+        if self.board.winner == WHITE:
+            return "white"
+        elif self.board.winner == BLACK:
+            return "black"
         return "none"
 
     def gogui_check_neighbors_cmd(self, args: List[str]):
         point_str = args[0]
         size = self.board.size
         move_coord = move_to_coord(point_str, size)
-        x, y = move_coord # 0, 0 (top, left)
-
         move_point = coord_to_point(move_coord[0], move_coord[1], size)
         player_color = self.board.get_color(move_point)
-
-        opponent_color = ""
-        captured_point = 0
         opponent_color = 3 - player_color
-        
-        directions = [[0, -1], [1, 0], [0, 1], [-1, 0], [-1, -1], [+1, -1], [+1, +1], [-1, 1]]
-        for direction in directions:
-            dir_x, dir_y = direction
-            current_x, current_y = x + dir_x, y + dir_y
+        captured_point = 0
+
+        # Walk the precomputed ray in each of the 8 directions
+        tables = self.board.tables
+        for d in range(8):
             step = 0
-            while True:
-                current_point = coord_to_point(current_x, current_y, size)
-                current_color = self.board.get_color(current_point)
-                if (current_color == opponent_color):
-                    current_x += dir_x
-                    current_y += dir_y
+            for current_color in self.board.board[tables.ray(move_point, d)]:
+                if current_color == opponent_color:
                     step += 1
-                elif (current_color == player_color):
+                elif current_color == player_color:
                     captured_point += step
                     break
                 else:
@@ -547,6 +556,7 @@ class GtpConnection:
         Modify this function for Assignment 1.
         Play a move args[1] for the given color args[0] in {'b', 'w'}.
         """
+        self.go_engine.stop_pondering()
         try:
             board_color = args[0].lower()
             board_move = args[1]
@@ -561,6 +571,7 @@ class GtpConnection:
             if args[1].lower() == "pass":
                 self.board.play_move(PASS, color)
                 self.board.current_player = opponent(color)
+                self.go_engine.on_play(self.board, PASS, color)
                 self.respond()
                 return
             # self.respond("debug2")
@@ -581,6 +592,7 @@ class GtpConnection:
                 self.respond("Illegal Move: {}".format(board_move))
                 return
             else:
+                self.go_engine.on_play(self.board, move, color)
                 self.debug_msg(
                     "Move: {}\nBoard:\n{}\n".format(board_move, self.board2d())
                 )
@@ -593,9 +605,24 @@ class GtpConnection:
         Modify this function for Assignment 1.
         Generate a move for color args[0] in {'b','w'}.
         """
+        # Send the responses so far before a possibly long search
+        self.flush()
+        self.go_engine.stop_pondering()
+        start = time.time()
         board_color = args[0].lower()
         color = color_to_int(board_color)
-        move = self.go_engine.get_move(self.board, color)
+        move = self.book_move(color)
+        if move == NO_POINT:
+            budget = self.time_manager.move_budget(self.board, color)
+            time_limit = self.go_engine.time_limit
+            if budget is not None:
+                self.go_engine.time_limit = budget
+            try:
+                move = self.go_engine.get_move(self.board, color)
+            finally:
+                # The budget is for this move only, timelimit stays
+                self.go_engine.time_limit = time_limit
+        self.time_manager.record_move(color, time.time() - start)
         move_coord = point_to_coord(move, self.board.size)
         move_as_string = format_point(move_coord)
 
@@ -607,20 +634,245 @@ class GtpConnection:
             self.respond("pass")
         elif self.board.is_legal(move, color):  # change
             self.board.play_move(move, color)
+            self.go_engine.on_play(self.board, move, color)
             self.respond(move_as_string)
+            self.go_engine.start_pondering(self.board)
         else:
             self.respond("Illegal move: {}".format(move_as_string))
 
+    def book_move(self, color: GO_COLOR) -> GO_POINT:
+        """
+        The opening book move for color, or NO_POINT if the position
+        is not in the book for the current board size
+        """
+        if not self.use_book or color != self.board.current_player:
+            return NO_POINT
+        size = self.board.size
+        if size not in self._books:
+            self._books[size] = OpeningBook(book_path(size))
+        return self._books[size].lookup(self.board)
+
+    def get_solver(self) -> Union[AlphaBetaSolver, LazySMPSolver]:
+        """
+        The solver, created on first use with a table of
+        2 ** solver_table_size_log2 buckets: an AlphaBetaSolver,
+        or a LazySMPSolver if solver_workers > 1
+        """
+        if self.solver is None:
+            if self.solver_workers > 1:
+                self.solver = LazySMPSolver(self.solver_workers,
+                                            self.solver_table_size_log2)
+            else:
+                self.solver = AlphaBetaSolver(
+                    TranspositionTable(self.solver_table_size_log2))
+        return self.solver
+
+    def close_solver(self) -> None:
+        """ Drop the solver, the next gogui-solve creates a new one """
+        if isinstance(self.solver, LazySMPSolver):
+            self._closed_solver_cpu_time += self.solver.worker_cpu_time
+            self.solver.close()
+        self.solver = None
+
+    def solver_table_size_cmd(self, args: List[str]) -> None:
+        """
+        Use a solver transposition table of 2 ** args[0] buckets.
+        The current table is dropped.
+        """
+        try:
+            size_log2 = int(args[0])
+        except ValueError:
+            size_log2 = 0
+        if not 0 < size_log2 <= MAX_SOLVER_TABLE_SIZE_LOG2:
+            self.error(self.argmap["solver_table_size"][1])
+            return
+        self.solver_table_size_log2 = size_log2
+        self.close_solver()
+        self.respond()
+
+    def solver_workers_cmd(self, args: List[str]) -> None:
+        """
+        Solve with args[0] processes sharing one table, see
+        LazySMPSolver. 1 uses a single-threaded AlphaBetaSolver.
+        """
+        try:
+            workers = int(args[0])
+        except ValueError:
+            workers = 0
+        if workers < 1:
+            self.error(self.argmap["solver_workers"][1])
+            return
+        if workers != self.solver_workers:
+            self.solver_workers = workers
+            self.close_solver()
+        self.respond()
+
+    def gogui_solve_cmd(self, args: List[str]) -> None:
+        """
+        Solve the position for the player to move, within the time limit.
+        Respond with the winner and a winning move, e.g. "b D4",
+        with just the winner if the player to move loses,
+        with "draw" and a drawing move, or with "unknown".
+        """
+        color = self.board.current_player
+        value, move = self.get_solver().solve(self.board, color,
+                                              self.go_engine.time_limit)
+        if value is None:
+            self.respond("unknown")
+            return
+        move_as_string = format_point(point_to_coord(move, self.board.size)) \
+            if move != NO_POINT else ""
+        if value == WIN:
+            winner = "b" if color == BLACK else "w"
+            self.respond("{} {}".format(winner, move_as_string).strip())
+        elif value == LOSS:
+            self.respond("w" if color == BLACK else "b")
+        else:
+            self.respond("draw {}".format(move_as_string).strip())
+
+    def timelimit_cmd(self, args: List[str]) -> None:
+        """
+        Set the wall-clock budget per genmove to args[0] seconds
+        """
+        try:
+            time_limit = float(args[0])
+        except ValueError:
+            time_limit = 0.0
+        if time_limit <= 0:
+            self.error(self.argmap["timelimit"][1])
+            return
+        self.go_engine.time_limit = time_limit
+        self.respond()
+
+    def time_settings_cmd(self, args: List[str]) -> None:
+        """
+        Set the time system: args[0] seconds of main time, then
+        Canadian byo-yomi of args[1] seconds for args[2] stones
+        """
+        try:
+            self.time_manager.set_time_settings(
+                float(args[0]), float(args[1]), int(args[2]))
+        except ValueError:
+            self.error(self.argmap["time_settings"][1])
+            return
+        self.respond()
+
+    def time_left_cmd(self, args: List[str]) -> None:
+        """
+        args[1] seconds are left for color args[0], with args[2] stones
+        to play in that time in byo-yomi, or 0 in main time
+        """
+        try:
+            color = color_to_int(args[0].lower())
+            self.time_manager.set_time_left(color, float(args[1]),
+                                            int(args[2]))
+        except (KeyError, ValueError):
+            self.error(self.argmap["time_left"][1])
+            return
+        self.respond()
+
+    def kgs_time_settings_cmd(self, args: List[str]) -> None:
+        """
+        Set the time system as KGS does:
+        none | absolute MAIN | byoyomi MAIN PERIOD_TIME PERIODS |
+        canadian MAIN BYO_YOMI_TIME STONES
+        """
+        usage = "Usage: kgs-time_settings {none | absolute MAIN | " \
+            "byoyomi MAIN PERIOD_TIME PERIODS | " \
+            "canadian MAIN BYO_YOMI_TIME STONES}"
+        num_args = {NO_TIME: 1, ABSOLUTE: 2, BYOYOMI: 4, CANADIAN: 4}
+        system = args[0].lower() if args else ""
+        if num_args.get(system) != len(args):
+            self.error(usage)
+            return
+        try:
+            if system == NO_TIME:
+                self.time_manager.set_system(NO_TIME)
+            elif system == ABSOLUTE:
+                self.time_manager.set_system(ABSOLUTE, float(args[1]))
+            else:
+                self.time_manager.set_system(system, float(args[1]),
+                                             float(args[2]), int(args[3]))
+        except ValueError:
+            self.error(usage)
+            return
+        self.respond()
+
+    def ponder_cmd(self, args: List[str]) -> None:
+        """
+        Turn searching during the opponent's turn on or off: args[0]
+        is on or off. Engines without pondering ignore it.
+        """
+        value = args[0].lower()
+        if value not in ("on", "off"):
+            self.error("Usage: ponder {on,off}")
+            return
+        self.go_engine.ponder = value == "on"
+        if not self.go_engine.ponder:
+            self.go_engine.stop_pondering()
+        self.respond()
+
+    def gogui_engine_stats_cmd(self, args: List[str]) -> None:
+        """
+        Report the statistics of the engine's last search,
+        such as playouts per second
+        """
+        stats = self.go_engine.get_stats()
+        self.respond("\n".join("{} {}".format(key, value)
+                               for key, value in stats.items()))
+
+    def stats_lines(self) -> List[str]:
+        """
+        The per-command latencies in milliseconds, then the counters of
+        the engine and of the solver, one per line
+        """
+        lines = self.stats.report()
+        for key, value in self.go_engine.get_stats().items():
+            lines.append("engine {} {}".format(key, value))
+        if self.solver is not None:
+            lines.append("solver nodes {}".format(self.solver.nodes))
+            for key, value in self.solver.table.get_stats().items():
+                lines.append("solver {} {}".format(key, value))
+        return lines
+
+    def gogui_stats_cmd(self, args: List[str]) -> None:
+        """
+        Report the latency of each command so far, and the engine and
+        solver counters, once the solver is used. With argument clear, reset the latencies.
+        """
+        if args and args[0] == "clear":
+            self.stats.clear()
+            self.respond()
+            return
+        self.respond("\n".join(self.stats_lines()))
+
+    def stats_interval_cmd(self, args: List[str]) -> None:
+        """
+        Write the stats to stderr every args[0] seconds, checked after
+        each command. 0 turns this off.
+        """
+        try:
+            interval = float(args[0])
+        except ValueError:
+            interval = -1.0
+        if interval < 0:
+            self.error(self.argmap["stats_interval"][1])
+            return
+        self.stats_interval = interval
+        self._last_stats_dump = time.time()
+        self.respond()
+
     def gogui_captured_check_cmd(self, args: List[str]) -> None:
         self.respond()
 
+    def gogui_rules_captured_count_cmd(self, args: List[str]) -> None:
+        """
+        Respond with the number of stones captured by white, a space,
+        and the number of stones captured by black.
+        """
+        self.respond("{} {}".format(self.board.get_captures(WHITE),
+                                    self.board.get_captures(BLACK)))
 
-# def gogui_rules_captured_count_cmd(self, args: List[str]) -> None:
-#     """
-#     Modify this function for Assignment 1.
-#     Respond with the score for white, an space, and the score for black.
-#     """
-#     self.respond(str(self.capture[0]) + " " + str(self.capture[0]))
 
 
 """
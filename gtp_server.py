@@ -0,0 +1,186 @@
+"""
+gtp_server.py
+An asyncio server for many concurrent GTP sessions in one process.
+
+Each client connection over TCP or a Unix socket is one GTP session,
+with its own GoBoard, engine and GtpConnection. All sessions share the
+per-size caches of the process, such as board_tables and zobrist_keys.
+Commands of one session run in order. Cheap commands run directly on
+the event loop. The slow commands genmove and gogui-solve run in a
+thread pool, so that a long search of one session does not block the
+other sessions. Searches in Python threads share the interpreter lock,
+so the pool size also bounds how many searches compete for the CPU.
+
+Start a server with, for example:
+    python3 gtp_server.py --engine GoMCTS --port 5000
+    python3 gtp_server.py --engine GoMC --unix /tmp/ninuki.sock
+    python3 gtp_server.py --engine Go0 --board bitboard
+"""
+
+import argparse
+import asyncio
+import importlib
+import io
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from sys import stderr
+from typing import Callable, Dict, Optional, Type
+
+from bitboard import BitboardGoBoard
+from board import GoBoard
+from board_base import DEFAULT_SIZE
+from engine import GoEngine
+from gtp_connection import GtpConnection, COMMAND_NUMBER
+
+"""
+Commands that may search for a long time, and so run in the thread pool
+"""
+SLOW_COMMANDS = {"genmove", "gogui-solve"}
+
+"""
+The board classes selected by --board
+"""
+BOARD_CLASSES: Dict[str, Type[GoBoard]] = {
+    "array": GoBoard,
+    "bitboard": BitboardGoBoard,
+}
+
+
+class GtpSession(object):
+    def __init__(self, engine: GoEngine,
+                 board_class: Type[GoBoard] = GoBoard) -> None:
+        """
+        One GTP session: a GtpConnection on its own board of
+        board_class, writing its responses to a buffer that the server
+        sends to the client
+        """
+        self.output: io.StringIO = io.StringIO()
+        self.connection: GtpConnection = GtpConnection(
+            engine, board_class(DEFAULT_SIZE), outfile=self.output)
+        self.connection.pipelined = True
+        self.closed: bool = False
+
+    def run_command(self, line: str) -> str:
+        """
+        Run one command line, and return the response text.
+        After quit, closed is set. An error in the command is
+        reported to the client, and the session goes on.
+        """
+        try:
+            self.connection.get_cmd(line)
+        except SystemExit:
+            self.closed = True
+        except Exception as e:
+            stderr.write("Error in GTP session: {}\n{}".format(
+                e, traceback.format_exc()))
+            self.connection.error("internal error: {}".format(e))
+        self.connection.flush()
+        response = self.output.getvalue()
+        self.output.seek(0)
+        self.output.truncate()
+        return response
+
+    def close(self) -> None:
+        """ Release the solver and the engine's threads and processes """
+        self.connection.close_solver()
+        self.connection.go_engine.close()
+
+
+class GtpServer(object):
+    def __init__(self, engine_factory: Callable[[], GoEngine],
+                 num_workers: Optional[int] = None,
+                 board_class: Type[GoBoard] = GoBoard) -> None:
+        """
+        engine_factory: creates the engine of each new session
+        num_workers: threads for slow commands, one per core by default
+        board_class: the board of each session, GoBoard or a subclass
+        """
+        self.engine_factory: Callable[[], GoEngine] = engine_factory
+        self.board_class: Type[GoBoard] = board_class
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=num_workers or os.cpu_count() or 1)
+        self.num_sessions: int = 0
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """ Serve one GTP session until quit or end of input """
+        loop = asyncio.get_running_loop()
+        session = GtpSession(self.engine_factory(), self.board_class)
+        self.num_sessions += 1
+        try:
+            while not session.closed:
+                data = await reader.readline()
+                if not data:
+                    break
+                line = data.decode("utf-8", "replace")
+                elements = COMMAND_NUMBER.sub("", line, 1).split()
+                if elements and elements[0] in SLOW_COMMANDS:
+                    response = await loop.run_in_executor(
+                        self.executor, session.run_command, line)
+                else:
+                    response = session.run_command(line)
+                if response:
+                    writer.write(response.encode("utf-8"))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.num_sessions -= 1
+            session.close()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve_tcp(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_unix(self, path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(self.handle_client, path)
+        async with server:
+            await server.serve_forever()
+
+
+def engine_class(name: str) -> Callable[[], GoEngine]:
+    """
+    The class of the engine with the given name. Each engine is defined
+    in the module of the same name, e.g. GoMCTS in GoMCTS.py.
+    """
+    return getattr(importlib.import_module(name), name)
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve GTP sessions over TCP or a Unix socket")
+    parser.add_argument("--engine", default="GoMCTS",
+                        help="engine class, e.g. Go0, GoMC, GoMCTS")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--unix", default=None,
+                        help="path of a Unix socket, instead of TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="threads for genmove and gogui-solve")
+    parser.add_argument("--board", choices=sorted(BOARD_CLASSES),
+                        default="array",
+                        help="board storage: numpy array or bitboards")
+    args = parser.parse_args()
+    server = GtpServer(engine_class(args.engine), args.workers,
+                       BOARD_CLASSES[args.board])
+    if args.unix is not None:
+        main = server.serve_unix(args.unix)
+    else:
+        main = server.serve_tcp(args.host, args.port)
+    try:
+        asyncio.run(main)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,197 @@
+"""
+opening_book.py
+A read-only opening book, and the offline tool that builds it.
+
+A book file holds fixed-size records (key, move), sorted by key.
+key is GoBoard.canonical_hash of a position, so the 8 symmetric images
+of a position share one record, and move is the book move in the
+canonical frame of that position. There is one file per board size,
+since the hash keys depend on the size.
+
+The file is opened lazily with np.memmap in read-only mode. A lookup
+is a binary search, and all engine processes on a host share the
+pages of the file through the page cache.
+
+Build a book with, for example:
+    python3 opening_book.py --sizes 7 9 --plies 2 --time 5
+"""
+
+import argparse
+import os
+import time
+from sys import stderr
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from board import GoBoard
+from board_base import (
+    EMPTY,
+    GO_COLOR,
+    GO_POINT,
+    NO_POINT,
+    PASS,
+)
+from solver import AlphaBetaSolver
+
+BOOK_RECORD = np.dtype([("key", "<u8"), ("move", "<i4")])
+EMPTY_BOOK = np.zeros(0, dtype=BOOK_RECORD)
+
+"""
+Default directory of the book files, next to this file.
+"""
+BOOK_DIRECTORY: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "books")
+
+
+def book_path(size: int, directory: str = BOOK_DIRECTORY) -> str:
+    """ The path of the book file for the given board size """
+    return os.path.join(directory, "ninuki{}.book".format(size))
+
+
+class OpeningBook(object):
+    def __init__(self, path: str) -> None:
+        """
+        The book stored in the file at path. The file is only opened
+        by the first lookup. A missing or empty file is an empty book,
+        and is looked for again by the next lookup, so a book written
+        later is used without a restart. The first miss is reported
+        on stderr.
+        """
+        self.path: str = path
+        self._records: Optional[np.ndarray] = None
+        self._reported_missing: bool = False
+
+    def _open(self) -> np.ndarray:
+        if self._records is None:
+            if os.path.exists(self.path) \
+                    and os.path.getsize(self.path) >= BOOK_RECORD.itemsize:
+                self._records = np.memmap(self.path, dtype=BOOK_RECORD,
+                                          mode="r")
+            else:
+                if not self._reported_missing:
+                    self._reported_missing = True
+                    stderr.write("No opening book at {}\n".format(self.path))
+                return EMPTY_BOOK
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._open())
+
+    def lookup(self, board: GoBoard) -> GO_POINT:
+        """
+        The book move for the player to move on board,
+        or NO_POINT if the position is not in the book
+        """
+        records = self._open()
+        if len(records) == 0:
+            return NO_POINT
+        symmetry = board.canonical_symmetry()
+        key = np.uint64(board.symmetric_hash(symmetry))
+        keys = records["key"]
+        i = int(np.searchsorted(keys, key))
+        if i == len(records) or keys[i] != key:
+            return NO_POINT
+        move = GO_POINT(board.tables.inverse_symmetries[
+            symmetry, records["move"][i]])
+        if board.get_color(move) != EMPTY \
+                or not board.is_legal(move, board.current_player):
+            return NO_POINT
+        return move
+
+
+def write_book(path: str, entries: Dict[int, int]) -> None:
+    """
+    Write the book entries, canonical key -> canonical move, to path.
+    The file is written to a temporary name and then renamed, so
+    processes that have the old book open keep reading a valid file.
+    """
+    records = np.zeros(len(entries), dtype=BOOK_RECORD)
+    records["key"] = np.array(list(entries.keys()), dtype=np.uint64)
+    records["move"] = np.array(list(entries.values()), dtype=np.int32)
+    records.sort(order="key")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    records.tofile(temp_path)
+    os.replace(temp_path, path)
+
+
+def search_move(board: GoBoard, color: GO_COLOR, time_limit: float,
+                engine: str) -> GO_POINT:
+    """ The move chosen by a search of time_limit seconds """
+    if engine == "solver":
+        _, move = AlphaBetaSolver().solve(board, color, time_limit)
+        return move
+    # GoMCTS imports gtp_connection, which imports this module
+    from GoMCTS import GoMCTS
+    player = GoMCTS()
+    player.time_limit = time_limit
+    return player.get_move(board, color)
+
+
+def build_book(size: int, plies: int, time_limit: float,
+               engine: str = "mcts", verbose: bool = False) -> Dict[int, int]:
+    """
+    Search every position reachable in the first plies moves,
+    up to symmetry, for time_limit seconds each.
+    Only candidate moves are followed, see GoBoard.get_candidate_moves.
+    Returns the book entries, canonical key -> canonical move.
+    """
+    entries: Dict[int, int] = {}
+    frontier: List[GoBoard] = [GoBoard(size)]
+    seen: Set[int] = {frontier[0].canonical_hash()}
+    for ply in range(plies):
+        next_frontier: List[GoBoard] = []
+        for board in frontier:
+            color = board.current_player
+            move = search_move(board, color, time_limit, engine)
+            if move == NO_POINT or move == PASS:
+                continue
+            symmetry = board.canonical_symmetry()
+            key = board.symmetric_hash(symmetry)
+            entries[key] = int(board.tables.symmetries[symmetry, move])
+            if ply + 1 == plies:
+                continue
+            for m in board.get_candidate_moves():
+                board.play_move(m, color)
+                if board.winner == EMPTY:
+                    child_key = board.canonical_hash()
+                    if child_key not in seen:
+                        seen.add(child_key)
+                        next_frontier.append(board.copy())
+                board.undo()
+        if verbose:
+            print("size {} ply {}: {} positions, {} entries".format(
+                size, ply, len(frontier), len(entries)))
+        frontier = next_frontier
+    return entries
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build opening book files for Ninuki")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7],
+                        help="board sizes to build books for")
+    parser.add_argument("--plies", type=int, default=2,
+                        help="number of opening moves covered")
+    parser.add_argument("--time", type=float, default=5.0,
+                        help="search time per position in seconds")
+    parser.add_argument("--engine", choices=["mcts", "solver"],
+                        default="mcts", help="search used for book moves")
+    parser.add_argument("--directory", default=BOOK_DIRECTORY,
+                        help="directory of the book files")
+    args = parser.parse_args()
+    for size in args.sizes:
+        start = time.time()
+        entries = build_book(size, args.plies, args.time, args.engine,
+                             verbose=True)
+        path = book_path(size, args.directory)
+        write_book(path, entries)
+        print("wrote {} entries to {} in {:.1f}s".format(
+            len(entries), path, time.time() - start))
+
+
+if __name__ == "__main__":
+    run()
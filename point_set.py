@@ -0,0 +1,65 @@
+"""
+point_set.py
+An indexed set of board points with O(1) add, remove, membership,
+size and uniform random sampling.
+This file is imported by board.py.
+"""
+
+import numpy as np
+
+from board_base import GO_POINT
+
+
+class PointSet(object):
+    """
+    The points are stored densely in self.items[0:self.count].
+    self.index maps each board array index to its position in items,
+    or -1 if the point is not in the set.
+    Removing a point moves the last item into its slot, so the order
+    of the items is not preserved.
+    """
+
+    def __init__(self, capacity: int, maxpoint: int) -> None:
+        self.items: np.ndarray = np.zeros(capacity, dtype=GO_POINT)
+        self.index: np.ndarray = np.full(maxpoint, -1, dtype=GO_POINT)
+        self.count: int = 0
+
+    def copy(self) -> 'PointSet':
+        s = PointSet.__new__(PointSet)
+        s.items = np.copy(self.items)
+        s.index = np.copy(self.index)
+        s.count = self.count
+        return s
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, point: GO_POINT) -> bool:
+        return self.index[point] >= 0
+
+    def add(self, point: GO_POINT) -> None:
+        assert self.index[point] < 0
+        self.items[self.count] = point
+        self.index[point] = self.count
+        self.count += 1
+
+    def remove(self, point: GO_POINT) -> None:
+        i = self.index[point]
+        assert i >= 0
+        self.count -= 1
+        last = self.items[self.count]
+        self.items[i] = last
+        self.index[last] = i
+        self.index[point] = -1
+
+    def random_point(self) -> GO_POINT:
+        """
+        Return a uniformly random point from the set.
+        The set must not be empty.
+        """
+        assert self.count > 0
+        return self.items[np.random.randint(self.count)]
+
+    def to_array(self) -> np.ndarray:
+        """ Return a copy of the points in the set """
+        return self.items[:self.count].copy()
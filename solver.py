@@ -0,0 +1,366 @@
+"""
+solver.py
+Iterative-deepening alpha-beta solver for Ninuki positions.
+
+Values are from the point of view of the player to move:
+WIN = 1, LOSS = -1, DRAW = 0. Positions at the search horizon also get 0,
+so a root value of WIN or LOSS is always proven, while a value of 0 is
+only a proven draw when no line of the search was cut at the horizon.
+The search records such cuts, also those hidden in transposition table
+entries that are not proven. Pair captures empty points again, so a
+game can last longer than the number of empty points, and the depth
+is not limited by it.
+
+A player with a move that makes five in a row or captures enough stones
+to win, found in O(1) from the board's threat and capture indexes, wins
+without further search. Moves are ordered by forced blocks of such
+opponent moves, captures, the transposition table move, two killer
+moves per ply, then the history heuristic.
+The transposition table is keyed on GoBoard.canonical_hash, so the 8
+symmetric images of a position share their entry.
+"""
+
+import atexit
+import os
+import time
+from multiprocessing import Event, Pool
+from typing import Any, List, Optional, Tuple
+
+from board import GoBoard
+from board_base import (
+    EMPTY,
+    GO_COLOR,
+    GO_POINT,
+    NO_POINT,
+    PASS,
+    opponent,
+)
+from transposition_table import (
+    TranspositionTable,
+    SharedTranspositionTable,
+    DEFAULT_TABLE_SIZE_LOG2,
+    EXACT,
+    LOWER_BOUND,
+    UPPER_BOUND,
+)
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+"""
+Depth stored in the transposition table for proven wins and losses,
+which stay valid at any remaining depth.
+"""
+PROVEN_DEPTH = 10000
+
+"""
+The clock is checked once every this many nodes.
+"""
+TIME_CHECK_INTERVAL = 256
+
+
+class SearchTimeout(Exception):
+    """ Raised inside the search when the time or node limit is reached """
+    pass
+
+
+class AlphaBetaSolver(object):
+    def __init__(self, table: Optional[TranspositionTable] = None,
+                 stop_event: Optional[Any] = None) -> None:
+        """
+        table: the transposition table to use, a new one by default.
+            A SharedTranspositionTable can be used as well.
+        stop_event: an optional multiprocessing Event; when it is set,
+            the search stops as if the time limit was reached
+        """
+        self.table: TranspositionTable = \
+            table if table is not None else TranspositionTable()
+        self.stop_event: Optional[Any] = stop_event
+        self.nodes: int = 0
+        self.depth: int = 0
+        self.completed_depth: int = 0
+        self._deadline: float = 0.0
+        self._node_limit: int = 0
+        self._ply: int = 0
+        self._killers: List[List[GO_POINT]] = []
+        self._history: List[int] = []
+        # Set when a line is cut at the horizon, see _negamax
+        self._horizon_cut: bool = False
+
+    def solve(self, board: GoBoard, color: GO_COLOR, time_limit: float,
+              node_limit: int = 0,
+              min_depth: int = 1) -> Tuple[Optional[int], GO_POINT]:
+        """
+        Solve the position on board with color to play.
+        Iterative deepening starts at min_depth.
+        Stops after time_limit seconds, or after node_limit nodes if
+        node_limit > 0.
+        Returns (value, move): value is WIN, LOSS or DRAW if proven,
+        None if the limit was reached first. move is the best move
+        found so far, NO_POINT if there is no move to play.
+        The board is unchanged on return.
+        """
+        self.nodes = 0
+        self._deadline = time.time() + time_limit
+        self._node_limit = node_limit
+        self._ply = 0
+        self._history = [0] * board.maxpoint
+        self.completed_depth = 0
+        best_move: GO_POINT = NO_POINT
+        if board.winner != EMPTY or board.num_empty_points() == 0:
+            return self._terminal_value(board, color), NO_POINT
+        self._killers = []
+        depth = max(1, min_depth)
+        while True:
+            self.depth = depth
+            while len(self._killers) <= depth:
+                self._killers.append([NO_POINT, NO_POINT])
+            self._horizon_cut = False
+            try:
+                value, move = self._search_root(board, color, depth,
+                                                best_move)
+            except SearchTimeout:
+                for _ in range(self._ply):
+                    board.undo()
+                return None, best_move
+            best_move = move
+            self.completed_depth = depth
+            if value != DRAW or not self._horizon_cut:
+                return value, best_move
+            depth += 1
+
+    def _search_root(self, board: GoBoard, color: GO_COLOR, depth: int,
+                     first_move: GO_POINT) -> Tuple[int, GO_POINT]:
+        alpha, beta = LOSS, WIN
+        best_value = LOSS - 1
+        best_move: GO_POINT = NO_POINT
+        for move in self._ordered_moves(board, first_move, 0):
+            board.play_move(move, color)
+            self._ply += 1
+            value = -self._negamax(board, opponent(color), depth - 1,
+                                   -beta, -alpha)
+            board.undo()
+            self._ply -= 1
+            if value > best_value:
+                best_value = value
+                best_move = move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+        return best_value, best_move
+
+    def _negamax(self, board: GoBoard, color: GO_COLOR, depth: int,
+                 alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 \
+                and (time.time() > self._deadline or
+                     (self.stop_event is not None
+                      and self.stop_event.is_set())):
+            raise SearchTimeout()
+        if self._node_limit and self.nodes >= self._node_limit:
+            raise SearchTimeout()
+        if board.winner != EMPTY or board.num_empty_points() == 0:
+            return self._terminal_value(board, color)
+        if board.has_winning_move(color):
+            return WIN
+        if depth == 0:
+            self._horizon_cut = True
+            return DRAW
+
+        # The table is keyed on the canonical form of the position, so
+        # rotations and mirror images share one entry. Its moves are
+        # stored in the canonical frame.
+        symmetry = board.canonical_symmetry()
+        key = board.symmetric_hash(symmetry)
+        tt_move: GO_POINT = NO_POINT
+        entry = self.table.lookup(key)
+        if entry is not None:
+            tt_depth, tt_value, tt_flag, tt_move = entry
+            if tt_move >= 0:
+                tt_move = board.tables.inverse_symmetries[symmetry, tt_move]
+            if tt_depth >= depth and (
+                    tt_flag == EXACT
+                    or (tt_flag == LOWER_BOUND and tt_value >= beta)
+                    or (tt_flag == UPPER_BOUND and tt_value <= alpha)):
+                if tt_depth != PROVEN_DEPTH:
+                    # The stored search may have been cut at its horizon
+                    self._horizon_cut = True
+                return tt_value
+
+        # Whether a line below this node is cut at the horizon
+        outer_cut = self._horizon_cut
+        self._horizon_cut = False
+        original_alpha = alpha
+        best_value = LOSS - 1
+        best_move: GO_POINT = NO_POINT
+        ply = self._ply
+        for move in self._ordered_moves(board, tt_move, ply):
+            board.play_move(move, color)
+            self._ply += 1
+            value = -self._negamax(board, opponent(color), depth - 1,
+                                   -beta, -alpha)
+            board.undo()
+            self._ply -= 1
+            if value > best_value:
+                best_value = value
+                best_move = move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                self._record_cutoff(move, ply, depth)
+                break
+
+        if best_value <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        # Without a cut below, the result holds at any remaining depth
+        proven = not self._horizon_cut \
+            or (best_value == WIN and flag != UPPER_BOUND) \
+            or (best_value == LOSS and flag != LOWER_BOUND)
+        self._horizon_cut = self._horizon_cut or outer_cut
+        if best_move >= 0:
+            best_move = board.tables.symmetries[symmetry, best_move]
+        self.table.store(key, PROVEN_DEPTH if proven else depth,
+                         best_value, flag, best_move)
+        return best_value
+
+    def _terminal_value(self, board: GoBoard, color: GO_COLOR) -> int:
+        if board.winner == EMPTY:
+            return DRAW
+        return WIN if board.winner == color else LOSS
+
+    def _ordered_moves(self, board: GoBoard, first_move: GO_POINT,
+                       ply: int) -> List[GO_POINT]:
+        """
+        All empty points: first the points that block an immediate
+        win of the opponent, then the captures, then first_move and the
+        killer moves of ply, then the rest by decreasing history score.
+        """
+        history = self._history
+        moves = sorted(board.get_empty_points(),
+                       key=lambda m: history[m], reverse=True)
+        front: List[GO_POINT] = []
+        blocks = board.forced_blocks(board.current_player)
+        captures = board.capture_threats.capture_moves(board.current_player)
+        for m in blocks + captures + [first_move] + self._killers[ply]:
+            if m != NO_POINT and m != PASS and m not in front \
+                    and board.get_color(m) == EMPTY:
+                front.append(m)
+        if not front:
+            return moves
+        return front + [m for m in moves if m not in front]
+
+    def _record_cutoff(self, move: GO_POINT, ply: int, depth: int) -> None:
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self._history[move] += depth * depth
+
+
+"""
+Lazy SMP: several processes search the same root independently,
+sharing one SharedTranspositionTable. Half of the workers start one
+ply deeper, so that the workers spread over different depths and fill
+the table for each other. The first proof found stops all workers.
+"""
+
+_worker_solver: Optional[AlphaBetaSolver] = None
+
+
+def _init_lazy_smp_worker(table_name: str, size_log2: int,
+                          stop_event: Any) -> None:
+    global _worker_solver
+    table = SharedTranspositionTable(size_log2, table_name)
+    _worker_solver = AlphaBetaSolver(table, stop_event)
+
+
+def _lazy_smp_worker(board: GoBoard, color: GO_COLOR, time_limit: float,
+                     node_limit: int, min_depth: int
+                     ) -> Tuple[Optional[int], GO_POINT, int, List[int], float]:
+    """
+    Returns the result of the search, its completed depth, its
+    counters: nodes, then table hits, misses and collisions, and its
+    CPU time
+    """
+    cpu_start = time.process_time()
+    table = _worker_solver.table
+    before = [table.hits, table.misses, table.collisions]
+    value, move = _worker_solver.solve(board, color, time_limit,
+                                       node_limit, min_depth)
+    if value is not None:
+        _worker_solver.stop_event.set()
+    counters = [_worker_solver.nodes, table.hits - before[0],
+                table.misses - before[1], table.collisions - before[2]]
+    return (value, move, _worker_solver.completed_depth, counters,
+            time.process_time() - cpu_start)
+
+
+class LazySMPSolver(object):
+    def __init__(self, num_workers: Optional[int] = None,
+                 size_log2: int = DEFAULT_TABLE_SIZE_LOG2) -> None:
+        """
+        A solver with the same solve interface as AlphaBetaSolver,
+        running on num_workers processes, one per core by default.
+        The worker pool and the shared table are kept between calls.
+        """
+        self.num_workers: int = num_workers or os.cpu_count() or 1
+        self.table: SharedTranspositionTable = \
+            SharedTranspositionTable(size_log2)
+        self._stop = Event()
+        self._pool: Optional[Pool] = None
+        self.nodes: int = 0
+        self.completed_depth: int = 0
+        # CPU seconds used by the workers so far
+        self.worker_cpu_time: float = 0.0
+        atexit.register(self.close)
+
+    def _get_pool(self) -> Pool:
+        if self._pool is None:
+            self._pool = Pool(self.num_workers, _init_lazy_smp_worker,
+                              (self.table.name, self.table.size_log2,
+                               self._stop))
+        return self._pool
+
+    def close(self) -> None:
+        """ Shut down the workers and free the shared table """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+            atexit.unregister(self.close)
+
+    def solve(self, board: GoBoard, color: GO_COLOR, time_limit: float,
+              node_limit: int = 0) -> Tuple[Optional[int], GO_POINT]:
+        """
+        Solve as AlphaBetaSolver.solve. The result is the first proof
+        found by any worker, or else the best move of the worker that
+        completed the deepest iteration.
+        nodes and the table counters add up the work of all workers.
+        """
+        self._stop.clear()
+        results = self._get_pool().starmap(
+            _lazy_smp_worker,
+            [(board, color, time_limit, node_limit, 1 + i % 2)
+             for i in range(self.num_workers)])
+        self.completed_depth = max(result[2] for result in results)
+        self.nodes = sum(result[3][0] for result in results)
+        self.worker_cpu_time += sum(result[4] for result in results)
+        for result in results:
+            _, hits, misses, collisions = result[3]
+            self.table.hits += hits
+            self.table.misses += misses
+            self.table.collisions += collisions
+        for value, move, _, _, _ in results:
+            if value is not None:
+                return value, move
+        best = max(results, key=lambda result: result[2])
+        return None, best[1]
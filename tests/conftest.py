@@ -0,0 +1,11 @@
+"""
+The modules of this repository are plain files in its root directory,
+so the root is put on the import path for the tests.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
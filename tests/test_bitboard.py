@@ -0,0 +1,60 @@
+"""
+BitboardGoBoard plays the same games as GoBoard: random games with
+captures, fives and undos leave both boards in the same state.
+"""
+
+import random
+
+from bitboard import BitboardGoBoard
+from board import GoBoard
+from board_base import BLACK, WHITE
+
+
+def same_state(board: GoBoard, bitboard: BitboardGoBoard) -> bool:
+    """ The board arrays, winners, captures and players are equal """
+    return (board.board.tobytes() == bitboard.board.tobytes()
+            and board.winner == bitboard.winner
+            and list(board.captures) == list(bitboard.captures)
+            and board.current_player == bitboard.current_player
+            and board.hash == bitboard.hash)
+
+
+def stones_of(board: GoBoard, color: int) -> int:
+    """ The stones of color on the board array, as a bitboard """
+    return sum(1 << int(p) for p in range(board.maxpoint)
+               if board.board[p] == color)
+
+
+def test_random_games_match_go_board() -> None:
+    rng = random.Random(7)
+    wins = captures = 0
+    for size in (5, 7, 9):
+        for game in range(10):
+            board = GoBoard(size)
+            bitboard = BitboardGoBoard(size)
+            moves = 0
+            for _ in range(3 * size * size):
+                if board.winner == 0 and board.num_empty_points() > 0 \
+                        and (moves == 0 or rng.random() < 0.8):
+                    candidates = board.get_candidate_moves()
+                    move = candidates[rng.randrange(len(candidates))]
+                    color = board.current_player
+                    assert board.play_move(move, color)
+                    assert bitboard.play_move(move, color)
+                    moves += 1
+                    wins += board.winner != 0
+                    captures += max(board.captures) > 0
+                elif moves > 0:
+                    board.undo()
+                    bitboard.undo()
+                    moves -= 1
+                assert same_state(board, bitboard)
+                for color in (BLACK, WHITE):
+                    assert bitboard.stones(color) == stones_of(board, color)
+            while moves > 0:
+                board.undo()
+                bitboard.undo()
+                moves -= 1
+                assert same_state(board, bitboard)
+            assert bitboard.stones(BLACK) == bitboard.stones(WHITE) == 0
+    assert wins > 0 and captures > 0
@@ -0,0 +1,148 @@
+"""
+Tests of GoBoard: play and undo restore all of its incremental data,
+is_legal agrees with playing the move on a copy, and random_playout
+ends the game as play_move would.
+"""
+
+import random
+from typing import Dict, Optional, Set
+
+import numpy as np
+
+from board import GoBoard
+from board_base import BLACK, WHITE, EMPTY, PASS, GO_COLOR, GO_POINT
+from test_solver import capture_positions
+
+
+def board_state(board: GoBoard) -> tuple:
+    """ Everything play_move changes, in a form that can be compared """
+    return (board.board.tobytes(), board.hash, list(board._sym_hashes),
+            list(board.captures), board.current_player, board.winner,
+            board.last_move, board.last2_move,
+            sorted(int(p) for p in board.get_empty_points()),
+            sorted(int(p) for p in board._candidates.to_array()),
+            list(board._near),
+            [list(c) for c in board.threats.counts],
+            list(board.threats.open_windows[BLACK]),
+            list(board.threats.open_windows[WHITE]),
+            [dict(p) for p in board.threats.win_points],
+            list(board.capture_threats.states),
+            [dict(p) for p in board.capture_threats.capture_points])
+
+
+def test_random_play_undo_restores_board() -> None:
+    """
+    Random sequences of moves and undos, with captures, always restore
+    the exact state seen before each move
+    """
+    rng = random.Random(2)
+    for size in (5, 7, 9):
+        for game in range(10):
+            board = GoBoard(size)
+            states = [board_state(board)]
+            for _ in range(3 * size * size):
+                if board.winner == 0 and board.num_empty_points() > 0 \
+                        and (len(states) == 1 or rng.random() < 0.7):
+                    candidates = board.get_candidate_moves()
+                    board.play_move(
+                        candidates[rng.randrange(len(candidates))],
+                        board.current_player)
+                    states.append(board_state(board))
+                elif len(states) > 1:
+                    states.pop()
+                    board.undo()
+                    assert board_state(board) == states[-1]
+            while len(states) > 1:
+                states.pop()
+                board.undo()
+                assert board_state(board) == states[-1]
+            assert board_state(board) == board_state(GoBoard(size))
+
+
+def test_play_undo_restores_captures() -> None:
+    board = GoBoard(7)
+    for row, col, color in [(4, 1, BLACK), (4, 2, WHITE), (5, 5, BLACK),
+                            (4, 3, WHITE)]:
+        board.play_move(board.pt(row, col), color)
+    before = board_state(board)
+    board.play_move(board.pt(4, 4), BLACK)
+    assert board.get_captures(BLACK) == 2
+    assert board.get_color(board.pt(4, 2)) == 0
+    board.undo()
+    assert board_state(board) == before
+
+
+def reference_is_legal(board: GoBoard, point: GO_POINT,
+                       color: GO_COLOR) -> bool:
+    """ Legality as first implemented: play the move on a copy """
+    if point == PASS:
+        return True
+    return board.copy().play_move(point, color)
+
+
+def test_is_legal_matches_copy_and_play() -> None:
+    """
+    On random positions, with captures and finished games, is_legal
+    agrees with playing the move on a copy and with the rules: a move
+    is legal on an empty point of a game that is not over.
+    It leaves the board unchanged.
+    """
+    rng = random.Random(3)
+    for size in (5, 7):
+        for _ in range(4):
+            board = GoBoard(size)
+            while True:
+                before = (board.board.tobytes(), board.hash)
+                for point in [PASS] + list(board.tables.points):
+                    for color in (BLACK, WHITE):
+                        legal = board.is_legal(point, color)
+                        assert legal == reference_is_legal(board, point, color)
+                        assert legal == (point == PASS or (
+                            board.winner == EMPTY
+                            and board.get_color(point) == EMPTY))
+                assert (board.board.tobytes(), board.hash) == before
+                if board.winner != EMPTY or board.num_empty_points() == 0:
+                    break
+                points = board.get_empty_points()
+                board.play_move(points[rng.randrange(len(points))],
+                                board.current_player)
+
+
+def outcomes(board: GoBoard,
+             memo: Optional[Dict[int, Set[GO_COLOR]]] = None) -> Set[GO_COLOR]:
+    """
+    The winners of all the ways to play the game out with play_move.
+    memo holds the result of each position by hash, for the many
+    orders of moves that lead to the same position.
+    """
+    if board.winner != EMPTY or board.num_empty_points() == 0:
+        return {board.winner}
+    if memo is None:
+        memo = {}
+    if board.hash not in memo:
+        result: Set[GO_COLOR] = set()
+        for point in board.get_empty_points():
+            board.play_move(point, board.current_player)
+            result |= outcomes(board, memo)
+            board.undo()
+        memo[board.hash] = result
+    return memo[board.hash]
+
+
+def test_random_playout_ends_game_as_play_move() -> None:
+    np.random.seed(5)
+    seen: Set[GO_COLOR] = set()
+    for board in capture_positions(20):
+        state = board_state(board)
+        possible = outcomes(board)
+        for _ in range(20):
+            winner = board.random_playout()
+            assert winner in possible
+            seen.add(winner)
+        assert board_state(board) == state
+    assert seen == {EMPTY, BLACK, WHITE}
+    for size in (5, 7, 9):
+        board = GoBoard(size)
+        for _ in range(5):
+            assert board.random_playout() in (EMPTY, BLACK, WHITE)
+        assert board_state(board) == board_state(GoBoard(size))
@@ -0,0 +1,61 @@
+"""
+BoardBatch plays the same games as GoBoard: after every step of random
+games, each game of the batch has the board, winner, captures and end
+of game of a GoBoard that played the same moves.
+"""
+
+import numpy as np
+
+from board import GoBoard
+from board_base import BLACK, WHITE, EMPTY
+from board_batch import BoardBatch
+
+
+def assert_same_games(batch: BoardBatch, boards: list) -> None:
+    for g, board in enumerate(boards):
+        assert np.array_equal(batch.boards[g], board.board)
+        assert batch.winner[g] == board.winner
+        assert batch.captures[g, BLACK] == board.get_captures(BLACK)
+        assert batch.captures[g, WHITE] == board.get_captures(WHITE)
+        assert batch.num_empty[g] == board.num_empty_points()
+        assert batch.done[g] == (board.winner != EMPTY
+                                 or board.num_empty_points() == 0)
+        if not batch.done[g]:
+            assert batch.current_player[g] == board.current_player
+
+
+def test_random_games_match_go_board() -> None:
+    np.random.seed(3)
+    wins = captures = 0
+    for size in (5, 7, 9):
+        boards = [GoBoard(size) for _ in range(20)]
+        batch = BoardBatch(size, len(boards))
+        while not np.all(batch.done):
+            moves = batch.random_moves()
+            for g, board in enumerate(boards):
+                if not batch.done[g]:
+                    assert board.play_move(moves[g], board.current_player)
+            batch.play_moves(moves)
+            assert_same_games(batch, boards)
+        wins += int(np.count_nonzero(batch.winner != EMPTY))
+        captures += int(np.count_nonzero(batch.captures[:, 1:]))
+    assert wins > 0 and captures > 0
+
+
+def test_from_board_continues_the_game() -> None:
+    np.random.seed(4)
+    board = GoBoard(7)
+    for _ in range(6):
+        moves = board.get_candidate_moves()
+        board.play_move(moves[np.random.randint(len(moves))],
+                        board.current_player)
+    boards = [board.copy() for _ in range(10)]
+    batch = BoardBatch.from_board(board, len(boards))
+    assert_same_games(batch, boards)
+    while not np.all(batch.done):
+        moves = batch.random_moves()
+        for g, game in enumerate(boards):
+            if not batch.done[g]:
+                assert game.play_move(moves[g], game.current_player)
+        batch.play_moves(moves)
+        assert_same_games(batch, boards)
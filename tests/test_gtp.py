@@ -0,0 +1,198 @@
+"""
+Replay the GTP regression files of the repository and compare every
+response with the recorded transcript in tests/data.
+"""
+
+import io
+import os
+from typing import List
+
+import numpy as np
+import pytest
+
+from board import GoBoard
+from board_base import PASS
+from gtp_connection import GtpConnection
+from Go0 import Go0
+from GoMCTSParallel import GoMCTSParallel
+from test_zobrist import scratch_hash
+
+GTP_FILES = ["assignment1-public-tests.gtp", "test_custom.gtp"]
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+DATA_DIR = os.path.join(TESTS_DIR, "data")
+
+
+def replay(path: str, check_board: bool = False) -> str:
+    """
+    Run the commands in path, and return all the responses.
+    With check_board, after every command the hash is checked against
+    scratch_hash, and all moves are undone and played again.
+    """
+    np.random.seed(0)
+    output = io.StringIO()
+    board = GoBoard(7)
+    connection = GtpConnection(Go0(), board, outfile=output)
+    with open(path) as f:
+        for line in f:
+            connection.get_cmd(line)
+            if check_board:
+                check_undo_replay(board)
+    return output.getvalue()
+
+
+def check_undo_replay(board: GoBoard) -> None:
+    assert board.hash == scratch_hash(board)
+    before = board.copy()
+    moves: List = []
+    while board._undo_stack:
+        point = board._undo_stack[-1][0]
+        color = board.get_color(point) if point != PASS \
+            else board._undo_stack[-1][5]
+        moves.append((point, color))
+        board.undo()
+        assert board.hash == scratch_hash(board)
+    for point, color in reversed(moves):
+        board.play_move(point, color)
+    assert board.hash == before.hash
+    assert np.array_equal(board.board, before.board)
+    assert board.captures == before.captures
+    assert board.current_player == before.current_player
+
+
+@pytest.mark.parametrize("name", GTP_FILES)
+def test_gtp_file_responses(name: str) -> None:
+    with open(os.path.join(DATA_DIR, name + ".out")) as f:
+        expected = f.read()
+    assert replay(os.path.join(ROOT_DIR, name)) == expected
+
+
+@pytest.mark.parametrize("name", GTP_FILES)
+def test_gtp_file_hash_and_undo(name: str) -> None:
+    """ The same responses when the board is checked after every command """
+    with open(os.path.join(DATA_DIR, name + ".out")) as f:
+        expected = f.read()
+    assert replay(os.path.join(ROOT_DIR, name), check_board=True) == expected
+
+
+def run_commands(connection: GtpConnection, output: io.StringIO,
+                 commands: List[str]) -> List[str]:
+    """ The response to each command, without the blank line after it """
+    responses = []
+    for command in commands:
+        connection.get_cmd(command)
+        responses.append(output.getvalue().rstrip())
+        output.seek(0)
+        output.truncate()
+    return responses
+
+
+def test_timelimit_rejects_bad_values() -> None:
+    output = io.StringIO()
+    engine = Go0()
+    connection = GtpConnection(engine, GoBoard(7), outfile=output)
+    responses = run_commands(connection, output, [
+        "timelimit abc", "timelimit 0", "timelimit -1", "timelimit 2.5"])
+    assert responses[:3] == ["? Usage: timelimit SECONDS"] * 3
+    assert responses[3] == "="
+    assert engine.time_limit == 2.5
+
+
+def test_solver_is_created_on_first_solve() -> None:
+    output = io.StringIO()
+    connection = GtpConnection(Go0(), GoBoard(4), outfile=output)
+    assert connection.solver is None
+    responses = run_commands(connection, output, [
+        "solver_table_size 0", "solver_table_size x", "solver_table_size 10",
+        "gogui-solve"])
+    assert responses[:2] == ["? Usage: solver_table_size LOG2"] * 2
+    assert responses[2] == "="
+    assert responses[3].startswith("=")
+    assert connection.solver.table.num_buckets == 1 << 10
+
+
+def test_solver_workers_gives_same_result() -> None:
+    output = io.StringIO()
+    board = GoBoard(5)
+    connection = GtpConnection(Go0(), board, outfile=output)
+    moves = ["a1", "c1", "a2", "c2", "a3", "c3", "a4", "e5"]
+    run_commands(connection, output, [
+        "play {} {}".format("bw"[i % 2], move.upper())
+        for i, move in enumerate(moves)])
+    single = run_commands(connection, output, ["gogui-solve"])
+    responses = run_commands(connection, output, [
+        "solver_workers 0", "solver_workers 2", "gogui-solve",
+        "solver_workers 1"])
+    connection.close_solver()
+    assert responses[0] == "? Usage: solver_workers INT"
+    assert responses[1] == "="
+    assert single[0].startswith("= b ")
+    assert responses[2].split()[:2] == single[0].split()[:2]
+    assert responses[3] == "="
+
+
+def test_genmove_budget_keeps_timelimit() -> None:
+    output = io.StringIO()
+    engine = Go0()
+    budgets = []
+    get_move = engine.get_move
+
+    def recording_get_move(board: GoBoard, color: int) -> int:
+        budgets.append(engine.time_limit)
+        return get_move(board, color)
+    engine.get_move = recording_get_move
+    connection = GtpConnection(engine, GoBoard(7), outfile=output)
+    connection.use_book = False
+    run_commands(connection, output, [
+        "timelimit 7", "time_settings 30 0 0", "genmove b"])
+    assert 0 < budgets[0] < 7
+    assert engine.time_limit == 7
+
+
+def test_gogui_stats_reports_commands() -> None:
+    output = io.StringIO()
+    connection = GtpConnection(Go0(), GoBoard(7), outfile=output)
+    responses = run_commands(connection, output, [
+        "play b D4", "play w C3", "gogui-stats", "gogui-stats clear",
+        "gogui-stats"])
+    lines = responses[2].split("\n")
+    assert lines[0].startswith("= command count wall_mean")
+    assert any(line.startswith("play 2 ") for line in lines)
+    assert not any(line.startswith("solver") for line in lines)
+    assert responses[3] == "="
+    assert not any(line.startswith("play ")
+                   for line in responses[4].split("\n"))
+
+
+def test_stats_interval_rejects_bad_values() -> None:
+    output = io.StringIO()
+    connection = GtpConnection(Go0(), GoBoard(7), outfile=output)
+    responses = run_commands(connection, output, [
+        "stats_interval abc", "stats_interval -1", "stats_interval 0",
+        "stats_interval 30"])
+    assert responses[:2] == ["? Usage: stats_interval SECONDS"] * 2
+    assert responses[2:] == ["=", "="]
+    assert connection.stats_interval == 30
+
+
+def test_stats_cpu_includes_worker_processes() -> None:
+    output = io.StringIO()
+    engine = GoMCTSParallel(2)
+    connection = GtpConnection(engine, GoBoard(5), outfile=output)
+    connection.use_book = False
+    try:
+        run_commands(connection, output, [
+            "timelimit 0.2", "genmove b", "solver_workers 2",
+            "gogui-solve"])
+        assert engine.worker_cpu_time > 0
+        assert connection.solver.worker_cpu_time > 0
+        genmove_cpu = connection.stats.histograms["genmove"][1].total
+        solve_cpu = connection.stats.histograms["gogui-solve"][1].total
+        assert genmove_cpu >= engine.worker_cpu_time
+        assert solve_cpu >= connection.solver.worker_cpu_time
+        workers = connection.worker_cpu_time()
+        connection.close_solver()
+        assert connection.worker_cpu_time() == workers
+    finally:
+        connection.close_solver()
+        engine.close()
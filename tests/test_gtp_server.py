@@ -0,0 +1,86 @@
+"""
+A GTP session over TCP runs its commands, on either board class, and
+is closed cleanly:
+the engine stops pondering and shuts down its worker processes.
+"""
+
+import asyncio
+import threading
+from typing import Callable, List, Type
+
+from board import GoBoard
+from gtp_server import BOARD_CLASSES, GtpServer
+from engine import GoEngine
+from Go0 import Go0
+from GoMCTS import GoMCTS
+from GoMCTSParallel import GoMCTSParallel
+
+
+def run_session(engine_factory: Callable[[], GoEngine], commands: bytes,
+                board_class: Type[GoBoard] = GoBoard) -> str:
+    """
+    Send commands in one session, then end the input as a client that
+    disconnects, and return all the responses
+    """
+    async def session() -> str:
+        gtp_server = GtpServer(engine_factory, 1, board_class)
+        server = await asyncio.start_server(
+            gtp_server.handle_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(commands)
+        await writer.drain()
+        writer.write_eof()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+        assert gtp_server.num_sessions == 0
+        return response.decode()
+    return asyncio.run(session())
+
+
+def recording(engine_class: Callable[[], GoEngine],
+              engines: List[GoEngine]) -> Callable[[], GoEngine]:
+    """ An engine factory that also appends each engine to engines """
+    def factory() -> GoEngine:
+        engine = engine_class()
+        engines.append(engine)
+        return engine
+    return factory
+
+
+def test_session_over_tcp() -> None:
+    response = run_session(Go0, b"name\nboardsize 7\nplay b D4\nquit\n")
+    assert response == "= Go0\n\n= \n\n= \n\n= \n\n"
+
+
+def test_session_on_bitboard() -> None:
+    response = run_session(Go0, b"boardsize 5\nplay b C3\ngenmove w\n"
+                           b"showboard\n", BOARD_CLASSES["bitboard"])
+    board = response.split("= ")[-1]
+    assert board.count("1") == 1 and board.count("2") == 1
+
+
+def test_session_end_stops_pondering() -> None:
+    engines: List[GoEngine] = []
+    response = run_session(
+        recording(GoMCTS, engines),
+        b"boardsize 7\ntimelimit 0.1\nponder on\ngenmove b\n")
+    assert response.count("=") == 4
+    engine = engines[0]
+    assert engine._ponder_thread is None
+    assert engine._ponder_stop.is_set()
+    assert not any(getattr(t, "_target", None) == engine._ponder
+                   for t in threading.enumerate())
+
+
+def test_session_end_closes_worker_pool() -> None:
+    engines: List[GoEngine] = []
+    response = run_session(
+        recording(lambda: GoMCTSParallel(2), engines),
+        b"boardsize 7\ntimelimit 0.2\ngenmove b\n")
+    assert response.count("=") == 3
+    assert engines[0]._pool is None
+
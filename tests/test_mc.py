@@ -0,0 +1,32 @@
+"""
+GoMC keeps to its time limit, and plays a sensible move on a large
+board even when few or no playouts finish.
+"""
+
+import time
+
+from board import GoBoard
+from board_base import BLACK, EMPTY
+from GoMC import GoMC
+
+
+def test_large_board_playouts_within_time_limit() -> None:
+    board = GoBoard(19)
+    engine = GoMC()
+    engine.time_limit = 0.5
+    start = time.time()
+    move = engine.get_move(board, BLACK)
+    assert time.time() - start < 0.6
+    assert engine.playouts > 0
+    assert board.get_color(move) == EMPTY
+
+
+def test_no_playouts_plays_best_static_move() -> None:
+    board = GoBoard(19)
+    engine = GoMC()
+    engine.time_limit = 1e-6
+    move = engine.get_move(board, BLACK)
+    assert engine.playouts == 0
+    best = max(board.threats.point_score(p, BLACK)
+               for p in board.get_empty_points())
+    assert board.threats.point_score(move, BLACK) == best
@@ -0,0 +1,124 @@
+"""
+GoMCTS keeps its tree between moves only while it matches the board,
+and pondering stops by itself at the node cap. GoMCTSParallel sums the
+root statistics of its workers, and keeps one pool for the game.
+"""
+
+import io
+
+import numpy as np
+
+from board import GoBoard
+from board_base import BLACK, WHITE, GO_COLOR, GO_POINT
+from engine import GoEngine
+from gtp_connection import GtpConnection
+from GoMCTS import GoMCTS
+from GoMCTSParallel import GoMCTSParallel, merge_results
+
+
+def test_pondering_stops_at_node_cap() -> None:
+    engine = GoMCTS(max_ponder_nodes=200)
+    engine.ponder = True
+    engine.start_pondering(GoBoard(7))
+    engine._ponder_thread.join(timeout=30)
+    assert not engine._ponder_thread.is_alive()
+    assert engine.root.visits == 200
+    assert engine.ponder_playouts == 200
+    engine.stop_pondering()
+
+
+def play(engine: GoEngine, board: GoBoard, move: GO_POINT,
+         color: GO_COLOR) -> None:
+    """ Play move on board and tell the engine, as GtpConnection does """
+    assert board.play_move(move, color)
+    engine.on_play(board, move, color)
+
+
+def test_reply_in_tree_keeps_subtree() -> None:
+    np.random.seed(1)
+    engine = GoMCTS()
+    engine.time_limit = 0.3
+    board = GoBoard(7)
+    move = engine.get_move(board, BLACK)
+    play(engine, board, move, BLACK)
+    reply = engine.root.most_visited_child()
+    assert reply is not None and reply.visits > 0
+    play(engine, board, reply.move, WHITE)
+    assert engine.root is reply
+    assert reply.parent is None
+    assert engine.root_hash == board.hash
+    visits = reply.visits
+    engine.get_move(board, BLACK)
+    assert engine.reused_visits == visits
+    assert engine.root is reply
+
+
+def test_reply_not_in_tree_drops_tree() -> None:
+    engine = GoMCTS()
+    engine.time_limit = 0.1
+    board = GoBoard(7)
+    play(engine, board, engine.get_move(board, BLACK), BLACK)
+    assert engine.root is not None
+    missing = next(p for p in board.get_empty_points()
+                   if p not in engine.root.children)
+    play(engine, board, missing, WHITE)
+    assert engine.root is None
+
+
+def test_reset_drops_tree() -> None:
+    engine = GoMCTS()
+    engine.time_limit = 0.1
+    connection = GtpConnection(engine, GoBoard(7), outfile=io.StringIO())
+    for command in ("clear_board", "boardsize 5"):
+        connection.get_cmd("genmove b")
+        assert engine.root is not None
+        connection.get_cmd(command)
+        assert engine.root is None
+
+
+def test_hash_mismatch_discards_tree() -> None:
+    engine = GoMCTS()
+    engine.time_limit = 0.1
+    board = GoBoard(7)
+    engine.get_move(board, BLACK)
+    old_root = engine.root
+    # The engine is not told about this move
+    other = board.copy()
+    other.play_move(other.get_candidate_moves()[0], BLACK)
+    engine.get_move(other, WHITE)
+    assert engine.root is not old_root
+    assert engine.reused_visits == 0
+    assert engine.root_hash == other.hash
+
+
+def test_merge_results_sums_workers() -> None:
+    visits, wins, playouts = merge_results([
+        ({10: (3, 1.5), 11: (2, 2.0)}, 5),
+        ({11: (4, 1.0), 12: (1, 0.0)}, 6)])
+    assert visits == {10: 3, 11: 6, 12: 1}
+    assert wins == {10: 1.5, 11: 3.0, 12: 0.0}
+    assert playouts == 11
+
+
+def test_parallel_pool_kept_for_the_game() -> None:
+    engine = GoMCTSParallel(2)
+    engine.time_limit = 0.1
+    board = GoBoard(7)
+    try:
+        move = engine.get_move(board, BLACK)
+        pool = engine._pool
+        assert pool is not None
+        assert engine.playouts > 0
+        board.play_move(move, BLACK)
+        engine.get_move(board, WHITE)
+        assert engine._pool is pool
+    finally:
+        engine.close()
+    assert engine._pool is None
+    engine.close()
+    board.undo()
+    try:
+        engine.get_move(board, BLACK)
+        assert engine._pool is not None and engine._pool is not pool
+    finally:
+        engine.close()
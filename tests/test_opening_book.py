@@ -0,0 +1,29 @@
+"""
+A missing book is not cached: a book file written later is used.
+"""
+
+import io
+import os
+
+from board import GoBoard
+from board_base import NO_POINT
+import opening_book
+from opening_book import OpeningBook, write_book
+
+
+def test_missing_book_is_retried(tmp_path, monkeypatch) -> None:
+    log = io.StringIO()
+    monkeypatch.setattr(opening_book, "stderr", log)
+    path = os.path.join(str(tmp_path), "ninuki7.book")
+    book = OpeningBook(path)
+    board = GoBoard(7)
+    assert book.lookup(board) == NO_POINT
+    assert book.lookup(board) == NO_POINT
+    assert log.getvalue().count("No opening book") == 1
+
+    symmetry = board.canonical_symmetry()
+    move = board.pt(4, 4)
+    write_book(path, {board.symmetric_hash(symmetry):
+                      int(board.tables.symmetries[symmetry, move])})
+    assert book.lookup(board) == move
+    assert len(book) == 1
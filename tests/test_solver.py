@@ -0,0 +1,145 @@
+"""
+The solvers prove the values found by exhaustive minimax, also when
+captures make games longer than the number of empty points, and the
+parallel LazySMPSolver proves the same values as AlphaBetaSolver.
+"""
+
+import random
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+
+from board import GoBoard
+from board_base import BLACK, WHITE, EMPTY, GO_COLOR, opponent
+from solver import AlphaBetaSolver, LazySMPSolver, WIN, DRAW, LOSS
+from transposition_table import TranspositionTable
+
+TIME_LIMIT = 60.0
+
+
+def minimax(board: GoBoard, color: GO_COLOR,
+            values: Optional[Dict[int, int]] = None) -> int:
+    """
+    The value of the position for color to play, by searching every
+    line to the end. values caches the value of each position by hash,
+    which includes the captures and the player to move.
+    """
+    if values is None:
+        values = {}
+    if board.winner != EMPTY:
+        return WIN if board.winner == color else LOSS
+    if board.num_empty_points() == 0:
+        return DRAW
+    if board.hash in values:
+        return values[board.hash]
+    best = LOSS
+    for move in list(board.get_empty_points()):
+        board.play_move(move, color)
+        best = max(best, -minimax(board, opponent(color), values))
+        board.undo()
+        if best == WIN:
+            break
+    values[board.hash] = best
+    return best
+
+
+def set_up(rows: List[str], black_captures: int, white_captures: int,
+           color: GO_COLOR) -> GoBoard:
+    """ The position of rows, from the top row down, X black, O white """
+    board = GoBoard(len(rows))
+    for i, line in enumerate(rows):
+        for col, c in enumerate(line, 1):
+            if c != ".":
+                board._set_stone(board.pt(len(rows) - i, col),
+                                 BLACK if c == "X" else WHITE)
+    board._set_captures(BLACK, black_captures)
+    board._set_captures(WHITE, white_captures)
+    board._set_current_player(color)
+    return board
+
+
+def capture_position(rng: random.Random, size: int,
+                     num_empty: int) -> Optional[GoBoard]:
+    """
+    A position of random moves with num_empty empty points, where
+    captures are played most of the time they are possible.
+    None if the game could not be kept going.
+    """
+    board = GoBoard(size)
+    while board.num_empty_points() > num_empty:
+        color = board.current_player
+        moves = board.capture_threats.capture_moves(color)
+        if not moves or rng.random() < 0.3:
+            moves = board.get_empty_points()
+        board.play_move(moves[rng.randrange(len(moves))], color)
+        if board.winner != EMPTY:
+            board.undo()
+            if rng.random() < 0.1:
+                return None
+    return board
+
+
+def capture_positions(num_positions: int) -> List[GoBoard]:
+    """ Nearly full 5x5 positions with captures """
+    rng = random.Random(1)
+    positions: List[GoBoard] = []
+    while len(positions) < num_positions:
+        board = capture_position(rng, 5, 4)
+        if board is not None \
+                and board.get_captures(BLACK) + board.get_captures(WHITE):
+            positions.append(board)
+    return positions
+
+
+"""
+Black to move wins, but a capture opens points again, so the game can
+last longer than the 5 empty points
+"""
+LONG_WIN = ["OXXX.", ".XOXX", "OO.OX", "OX..O", "XOXOX"]
+
+
+def test_win_longer_than_empty_points() -> None:
+    board = set_up(LONG_WIN, 2, 0, BLACK)
+    assert minimax(board.copy(), BLACK) == WIN
+    value, move = AlphaBetaSolver().solve(board, BLACK, TIME_LIMIT)
+    assert value == WIN
+    board.play_move(move, BLACK)
+    assert minimax(board, WHITE) == LOSS
+
+
+def test_solver_matches_minimax_with_captures() -> None:
+    for board in capture_positions(30):
+        color = board.current_player
+        expected = minimax(board.copy(), color)
+        value, _ = AlphaBetaSolver(TranspositionTable(12)).solve(
+            board, color, TIME_LIMIT)
+        assert value == expected
+
+
+@pytest.fixture(scope="module")
+def lazy_smp_solver() -> Iterator[LazySMPSolver]:
+    solver = LazySMPSolver(2, size_log2=12)
+    yield solver
+    solver.close()
+
+
+def test_lazy_smp_matches_alpha_beta(lazy_smp_solver: LazySMPSolver) -> None:
+    values = set()
+    for board in capture_positions(12):
+        color = board.current_player
+        expected, _ = AlphaBetaSolver(TranspositionTable(12)).solve(
+            board, color, TIME_LIMIT)
+        assert expected is not None
+        lazy_smp_solver.table.clear()
+        value, _ = lazy_smp_solver.solve(board, color, TIME_LIMIT)
+        assert value == expected
+        values.add(value)
+    assert values == {WIN, DRAW, LOSS}
+
+
+def test_lazy_smp_win_longer_than_empty_points(
+        lazy_smp_solver: LazySMPSolver) -> None:
+    lazy_smp_solver.table.clear()
+    value, _ = lazy_smp_solver.solve(set_up(LONG_WIN, 2, 0, BLACK), BLACK,
+                                     TIME_LIMIT)
+    assert value == WIN
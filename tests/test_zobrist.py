@@ -0,0 +1,124 @@
+"""
+The Zobrist hash of GoBoard, and the hashes of its 8 symmetric images,
+updated incrementally by play_move and undo, equal the hashes computed
+from the whole position. The canonical hash is the same for all images.
+"""
+
+import random
+from typing import Iterator
+
+import numpy as np
+
+from board import GoBoard
+from board_base import BLACK, WHITE, EMPTY
+from board_tables import NUM_SYMMETRIES
+
+
+def scratch_hash(board: GoBoard) -> int:
+    """ The Zobrist hash of board, computed from the whole position """
+    keys = board._zobrist
+    h = 0
+    for color in (BLACK, WHITE):
+        for point in np.nonzero(board.board == color)[0]:
+            h ^= keys.stones[color][point]
+        h ^= keys.captures[color][board.get_captures(color)]
+    if board.current_player == WHITE:
+        h ^= keys.side
+    return h
+
+
+def scratch_sym_hashes(board: GoBoard) -> list:
+    """
+    The stone hash of each symmetric image of board, computed from the
+    whole position
+    """
+    keys = board._zobrist
+    symmetries = board.tables.symmetries
+    hashes = []
+    for k in range(NUM_SYMMETRIES):
+        h = 0
+        for color in (BLACK, WHITE):
+            for point in np.nonzero(board.board == color)[0]:
+                h ^= keys.stones[color][symmetries[k, point]]
+        hashes.append(h)
+    return hashes
+
+
+def image(board: GoBoard, k: int) -> GoBoard:
+    """ A new board with the image of the position under symmetry k """
+    result = GoBoard(board.size)
+    symmetries = board.tables.symmetries
+    for point in board.tables.points:
+        if board.board[point] != EMPTY:
+            result._set_stone(symmetries[k, point], board.board[point])
+    result._set_captures(BLACK, board.get_captures(BLACK))
+    result._set_captures(WHITE, board.get_captures(WHITE))
+    result._set_current_player(board.current_player)
+    return result
+
+
+def random_games(seed: int) -> Iterator[GoBoard]:
+    """ Boards of random games on 5x5, 7x7 and 9x9, after every move """
+    rng = random.Random(seed)
+    for size in (5, 7, 9):
+        for game in range(3):
+            board = GoBoard(size)
+            while board.winner == EMPTY and board.num_empty_points() > 0:
+                points = board.get_empty_points()
+                board.play_move(points[rng.randrange(len(points))],
+                                board.current_player)
+                yield board
+
+
+def test_canonical_hash_same_for_all_images() -> None:
+    for board in random_games(2):
+        canonical = board.canonical_hash()
+        for k in range(NUM_SYMMETRIES):
+            other = image(board, k)
+            assert other.hash == board.symmetric_hash(k)
+            assert other.canonical_hash() == canonical
+
+
+def test_sym_hashes_after_play_and_undo() -> None:
+    rng = random.Random(3)
+    for size in (5, 7, 9):
+        board = GoBoard(size)
+        history = [list(board._sym_hashes)]
+        for _ in range(3 * size * size):
+            if board.winner == EMPTY and board.num_empty_points() > 0 \
+                    and (len(history) == 1 or rng.random() < 0.7):
+                points = board.get_empty_points()
+                board.play_move(points[rng.randrange(len(points))],
+                                board.current_player)
+                history.append(list(board._sym_hashes))
+            elif len(history) > 1:
+                history.pop()
+                board.undo()
+                assert board._sym_hashes == history[-1]
+            assert board._sym_hashes == scratch_sym_hashes(board)
+        while len(history) > 1:
+            history.pop()
+            board.undo()
+            assert board._sym_hashes == scratch_sym_hashes(board)
+        assert board._sym_hashes == [0] * NUM_SYMMETRIES
+
+
+def test_zobrist_hash_after_play_and_undo() -> None:
+    rng = random.Random(1)
+    for size in (5, 7, 9):
+        board = GoBoard(size)
+        hashes = [board.hash]
+        for _ in range(size * size):
+            if board.winner != 0 or board.num_empty_points() == 0:
+                break
+            points = board.get_empty_points()
+            board.play_move(points[rng.randrange(len(points))],
+                            board.current_player)
+            assert board.hash == scratch_hash(board)
+            hashes.append(board.hash)
+        while len(hashes) > 1:
+            hashes.pop()
+            board.undo()
+            assert board.hash == hashes[-1]
+            assert board.hash == scratch_hash(board)
+        assert board.hash == 0
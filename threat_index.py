@@ -0,0 +1,178 @@
+"""
+threat_index.py
+Incremental five-in-a-row threat index for a GoBoard.
+This file is imported by board.py.
+
+For every window of 5 points in a line (see board_tables), the index
+keeps the number of stones of each color in it. A window is open for a
+color if it holds no stone of the opponent. From these counts it keeps:
+- the number of open windows of each color with k stones, k = 0..5
+- the winning points of each color: the empty point of each open
+  window that holds 4 stones of that color
+Playing or removing a stone updates only the windows through its point.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from board_base import BLACK, WHITE, EMPTY, GO_COLOR, GO_POINT, opponent
+from board_tables import board_tables, BoardTables, WIN_LENGTH
+
+
+class ThreatIndex(object):
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        tables: BoardTables = board_tables(size)
+        self._windows: List[List[int]] = tables.window_lists
+        self._through: List[List[int]] = tables.windows_through_lists
+        num_windows = tables.num_windows
+        # Indexed by color: EMPTY, BLACK, WHITE
+        self.counts: List[List[int]] = [
+            [], [0] * num_windows, [0] * num_windows]
+        self.open_windows: List[List[int]] = [
+            [], [num_windows] + [0] * WIN_LENGTH,
+            [num_windows] + [0] * WIN_LENGTH]
+        self.win_points: List[Dict[int, int]] = [{}, {}, {}]
+
+    def copy(self) -> 'ThreatIndex':
+        t = ThreatIndex.__new__(ThreatIndex)
+        t.size = self.size
+        t._windows = self._windows
+        t._through = self._through
+        t.counts = [[], list(self.counts[BLACK]), list(self.counts[WHITE])]
+        t.open_windows = [[], list(self.open_windows[BLACK]),
+                          list(self.open_windows[WHITE])]
+        t.win_points = [{}, dict(self.win_points[BLACK]),
+                        dict(self.win_points[WHITE])]
+        return t
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_windows"]
+        del state["_through"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        tables = board_tables(self.size)
+        self._windows = tables.window_lists
+        self._through = tables.windows_through_lists
+
+    def _add_win_point(self, color: GO_COLOR, point: int) -> None:
+        points = self.win_points[color]
+        points[point] = points.get(point, 0) + 1
+
+    def _remove_win_point(self, color: GO_COLOR, point: int) -> None:
+        points = self.win_points[color]
+        if points[point] == 1:
+            del points[point]
+        else:
+            points[point] -= 1
+
+    def _empty_point_in(self, w: int, board: np.ndarray,
+                        exclude: int = -1) -> int:
+        for p in self._windows[w]:
+            if p != exclude and board[p] == EMPTY:
+                return p
+        assert False
+
+    def add_stone(self, point: GO_POINT, color: GO_COLOR,
+                  board: np.ndarray) -> None:
+        """
+        Update the index after a stone of color was put on point.
+        board is the board array, already containing the stone.
+        """
+        point = int(point)
+        opp = opponent(color)
+        own_counts = self.counts[color]
+        opp_counts = self.counts[opp]
+        own_open = self.open_windows[color]
+        opp_open = self.open_windows[opp]
+        for w in self._through[point]:
+            own = own_counts[w]
+            other = opp_counts[w]
+            own_counts[w] = own + 1
+            if other == 0:
+                own_open[own] -= 1
+                own_open[own + 1] += 1
+                if own == 4:
+                    self._remove_win_point(color, point)
+                elif own == 3:
+                    self._add_win_point(
+                        color, self._empty_point_in(w, board))
+            if own == 0:
+                opp_open[other] -= 1
+                if other == 4:
+                    self._remove_win_point(opp, point)
+
+    def remove_stone(self, point: GO_POINT, color: GO_COLOR,
+                     board: np.ndarray) -> None:
+        """
+        Update the index after the stone of color on point was removed.
+        board is the board array, where point is already empty.
+        """
+        point = int(point)
+        opp = opponent(color)
+        own_counts = self.counts[color]
+        opp_counts = self.counts[opp]
+        own_open = self.open_windows[color]
+        opp_open = self.open_windows[opp]
+        for w in self._through[point]:
+            own = own_counts[w]
+            other = opp_counts[w]
+            own_counts[w] = own - 1
+            if other == 0:
+                own_open[own] -= 1
+                own_open[own - 1] += 1
+                if own == 5:
+                    self._add_win_point(color, point)
+                elif own == 4:
+                    self._remove_win_point(
+                        color, self._empty_point_in(w, board, point))
+            if own == 1:
+                opp_open[other] += 1
+                if other == 4:
+                    self._add_win_point(opp, point)
+
+    def winning_moves(self, color: GO_COLOR) -> List[GO_POINT]:
+        """ The empty points where color would make five in a row """
+        return [GO_POINT(p) for p in self.win_points[color]]
+
+    def forced_blocks(self, color: GO_COLOR) -> List[GO_POINT]:
+        """
+        The points color must play to stop an immediate opponent win
+        """
+        return self.winning_moves(opponent(color))
+
+    def has_winning_move(self, color: GO_COLOR) -> bool:
+        return len(self.win_points[color]) > 0
+
+    def num_open_windows(self, color: GO_COLOR, stones: int) -> int:
+        """
+        The number of windows holding exactly stones stones of color
+        and none of the opponent. With stones = 3 or 4, these are the
+        open threes and fours of color.
+        """
+        return self.open_windows[color][stones]
+
+    def point_score(self, point: GO_POINT, color: GO_COLOR) -> int:
+        """
+        A static value of the empty point for color to play: each
+        window through point that is open for a player adds the square
+        of one plus that player's stones in it. Points that extend or
+        block long lines score high, and on an empty board the points
+        in the most windows, near the center, score highest.
+        """
+        opp = opponent(color)
+        own_counts = self.counts[color]
+        opp_counts = self.counts[opp]
+        score = 0
+        for w in self._through[point]:
+            own = own_counts[w]
+            other = opp_counts[w]
+            if other == 0:
+                score += (1 + own) * (1 + own)
+            if own == 0:
+                score += (1 + other) * (1 + other)
+        return score
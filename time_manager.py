@@ -0,0 +1,192 @@
+"""
+time_manager.py
+Clock handling for the GTP time control commands.
+This file is imported by gtp_connection.py.
+
+The TimeManager stores the time system set by time_settings or
+kgs-time_settings and the remaining time of each player, given by
+time_left or counted from our own moves. For each genmove it computes
+the budget of the move from:
+- the remaining main time, spread over an estimate of the moves left
+- the byo-yomi time per move, once in byo-yomi or as a reserve
+- the criticality of the position: more time when a player has open
+  threes or can capture, less when there is an immediate win or a
+  forced block
+"""
+
+from typing import List, Optional
+
+from board import GoBoard
+from board_base import BLACK, WHITE, GO_COLOR, opponent
+
+"""
+Time systems, as named by kgs-time_settings.
+time_settings main byo_time byo_stones gives CANADIAN, or NO_TIME when
+byo_time > 0 and byo_stones == 0, or ABSOLUTE when byo_time == 0.
+"""
+NO_TIME: str = "none"
+ABSOLUTE: str = "absolute"
+CANADIAN: str = "canadian"
+BYOYOMI: str = "byoyomi"
+
+"""
+The smallest estimate of our moves left in the game
+"""
+MIN_MOVES_LEFT: int = 10
+
+"""
+Seconds kept back from every budget for the time taken outside the
+search, e.g. by GTP and the network
+"""
+SAFETY_MARGIN: float = 0.1
+
+"""
+Budget of a move when less time is left
+"""
+MIN_BUDGET: float = 0.05
+
+"""
+At most this fraction of the remaining time is used for one move
+"""
+MAX_FRACTION: float = 0.5
+
+"""
+The budget is multiplied by up to this factor in critical positions
+"""
+CRITICAL_FACTOR: float = 2.0
+
+
+class TimeManager(object):
+    def __init__(self) -> None:
+        self.system: str = NO_TIME
+        self.main_time: float = 0.0
+        self.byo_yomi_time: float = 0.0
+        # Stones per period for CANADIAN, number of periods for BYOYOMI
+        self.byo_yomi_stones: int = 0
+        # Indexed by color: EMPTY, BLACK, WHITE
+        self.time_left: List[float] = [0.0, 0.0, 0.0]
+        # Stones left in the current byo-yomi period, 0 in main time.
+        # For BYOYOMI, the number of periods left.
+        self.stones_left: List[int] = [0, 0, 0]
+
+    def set_time_settings(self, main_time: float, byo_yomi_time: float,
+                          byo_yomi_stones: int) -> None:
+        """ The GTP time_settings command, Canadian byo-yomi """
+        if byo_yomi_time > 0 and byo_yomi_stones == 0:
+            self.set_system(NO_TIME)
+        elif byo_yomi_time == 0:
+            self.set_system(ABSOLUTE, main_time)
+        else:
+            self.set_system(CANADIAN, main_time, byo_yomi_time,
+                            byo_yomi_stones)
+
+    def set_system(self, system: str, main_time: float = 0.0,
+                   byo_yomi_time: float = 0.0,
+                   byo_yomi_stones: int = 0) -> None:
+        """ Set the time system, and reset both clocks to main_time """
+        assert system in (NO_TIME, ABSOLUTE, CANADIAN, BYOYOMI)
+        if (system == CANADIAN or system == BYOYOMI) \
+                and (byo_yomi_time <= 0 or byo_yomi_stones <= 0):
+            system = ABSOLUTE
+        self.system = system
+        self.main_time = main_time
+        self.byo_yomi_time = byo_yomi_time
+        self.byo_yomi_stones = byo_yomi_stones
+        for color in (BLACK, WHITE):
+            self.time_left[color] = main_time
+            self.stones_left[color] = 0
+        if system == BYOYOMI and main_time == 0:
+            self._start_byo_yomi(BLACK)
+            self._start_byo_yomi(WHITE)
+
+    def set_time_left(self, color: GO_COLOR, time_left: float,
+                      stones: int) -> None:
+        """
+        The GTP time_left command: time_left seconds are left for
+        color, in main time if stones == 0, else in byo-yomi with
+        stones stones (periods for BYOYOMI) to play in that time
+        """
+        self.time_left[color] = time_left
+        self.stones_left[color] = stones
+
+    def is_active(self) -> bool:
+        return self.system != NO_TIME
+
+    def _start_byo_yomi(self, color: GO_COLOR) -> None:
+        self.time_left[color] = self.byo_yomi_time
+        self.stones_left[color] = self.byo_yomi_stones
+
+    def record_move(self, color: GO_COLOR, elapsed: float) -> None:
+        """
+        Count elapsed seconds used by a move of color, for controllers
+        that do not send time_left
+        """
+        if not self.is_active():
+            return
+        stones = self.stones_left[color]
+        self.time_left[color] -= elapsed
+        if self.system == CANADIAN:
+            if stones > 0:
+                if stones == 1:
+                    self._start_byo_yomi(color)
+                else:
+                    self.stones_left[color] = stones - 1
+            elif self.time_left[color] <= 0:
+                self._start_byo_yomi(color)
+        elif self.system == BYOYOMI:
+            if stones > 0:
+                if self.time_left[color] > 0:
+                    self.time_left[color] = self.byo_yomi_time
+                elif stones > 1:
+                    self.time_left[color] = self.byo_yomi_time
+                    self.stones_left[color] = stones - 1
+            elif self.time_left[color] <= 0:
+                self._start_byo_yomi(color)
+
+    def criticality(self, board: GoBoard, color: GO_COLOR) -> float:
+        """
+        A number from 0 to 1: how much the position needs a deep search.
+        Open threes of either player, and possible captures, make the
+        position critical.
+        """
+        opp = opponent(color)
+        threats = board.threats.num_open_windows(color, 3) \
+            + board.threats.num_open_windows(opp, 3) \
+            + len(board.capture_threats.capture_points[color]) \
+            + len(board.capture_threats.capture_points[opp])
+        return min(1.0, threats / 4)
+
+    def move_budget(self, board: GoBoard, color: GO_COLOR) -> Optional[float]:
+        """
+        The search time in seconds for the next move of color on board,
+        or None if there is no time limit
+        """
+        if not self.is_active():
+            return None
+        left = self.time_left[color]
+        stones = self.stones_left[color]
+        if stones > 0:
+            # In byo-yomi: the period time is for stones moves,
+            # or for every move with BYOYOMI
+            per_move = left if self.system == BYOYOMI else left / stones
+            budget = per_move
+            limit = per_move
+        else:
+            # After main time, every move still gets the byo-yomi time
+            # per move, so it is added to the share of the main time
+            reserve = 0.0
+            if self.system == CANADIAN:
+                reserve = self.byo_yomi_time / self.byo_yomi_stones
+            elif self.system == BYOYOMI:
+                reserve = self.byo_yomi_time
+            moves_left = max(MIN_MOVES_LEFT, board.num_empty_points() // 2)
+            budget = left / moves_left + reserve
+            limit = max(left * MAX_FRACTION, reserve)
+        if board.has_winning_move(color) or board.forced_blocks(color):
+            # The engines play these moves with little or no search
+            budget /= CRITICAL_FACTOR
+        else:
+            budget *= 1.0 + (CRITICAL_FACTOR - 1.0) \
+                * self.criticality(board, color)
+        budget = min(budget, limit) - SAFETY_MARGIN
+        return max(MIN_BUDGET, budget)
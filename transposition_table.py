@@ -0,0 +1,194 @@
+"""
+transposition_table.py
+A fixed-size transposition table keyed on the Zobrist hash of a GoBoard.
+
+The table is stored in preallocated numpy arrays, so its memory use
+does not grow during a search. Each bucket holds two entries:
+- slot 0 is depth-preferred: it is only replaced by a search that is
+  at least as deep, or by a new result for the same position
+- slot 1 is always-replace: it takes every entry that slot 0 rejects
+"""
+
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from board_base import GO_POINT, NO_POINT
+
+"""
+Meaning of a stored value, as in alpha-beta search.
+"""
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+DEFAULT_TABLE_SIZE_LOG2: int = 20
+
+
+class TranspositionTable(object):
+    def __init__(self, size_log2: int = DEFAULT_TABLE_SIZE_LOG2) -> None:
+        """
+        Create a table with 2 ** size_log2 buckets of two entries each
+        """
+        self.num_buckets: int = 1 << size_log2
+        self.mask: int = self.num_buckets - 1
+        n = 2 * self.num_buckets
+        self.keys: np.ndarray = np.zeros(n, dtype=np.uint64)
+        # depth -1 marks an unused entry
+        self.depths: np.ndarray = np.full(n, -1, dtype=np.int16)
+        self.values: np.ndarray = np.zeros(n, dtype=np.int32)
+        self.flags: np.ndarray = np.zeros(n, dtype=np.int8)
+        self.moves: np.ndarray = np.full(n, NO_POINT, dtype=GO_POINT)
+        self.hits: int = 0
+        self.misses: int = 0
+        self.collisions: int = 0
+
+    def clear(self) -> None:
+        self.depths.fill(-1)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int, int, GO_POINT]]:
+        """
+        Return (depth, value, flag, move) stored for key, or None.
+        A miss on a bucket that holds other positions counts as a collision.
+        """
+        i = (key & self.mask) << 1
+        for slot in (i, i + 1):
+            if self.depths[slot] >= 0 and self.keys[slot] == key:
+                self.hits += 1
+                return (int(self.depths[slot]), int(self.values[slot]),
+                        int(self.flags[slot]), self.moves[slot])
+        self.misses += 1
+        if self.depths[i] >= 0 or self.depths[i + 1] >= 0:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, value: int, flag: int,
+              move: GO_POINT) -> None:
+        i = (key & self.mask) << 1
+        if self.depths[i] < 0 or self.keys[i] == key \
+                or depth >= self.depths[i]:
+            slot = i
+        else:
+            slot = i + 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.values[slot] = value
+        self.flags[slot] = flag
+        self.moves[slot] = move
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"tt_hits": self.hits,
+                "tt_misses": self.misses,
+                "tt_collisions": self.collisions}
+
+
+"""
+Record layout of SharedTranspositionTable.
+Each entry is two 64-bit words: data packs depth, value, flag and move,
+and check holds key XOR data. A reader accepts an entry only if
+check XOR data equals its key, so an entry torn by two processes
+writing at the same time is rejected instead of misread. This makes
+the table safe to share without locks.
+"""
+SHARED_ENTRY_DTYPE = np.dtype([("check", "<u8"), ("data", "<u8")])
+_MOVE_OFFSET = 2  # so that PASS and NO_POINT pack as non-negative
+
+
+def _pack(depth: int, value: int, flag: int, move: GO_POINT) -> int:
+    return (depth & 0xFFFF) | ((value + 0x8000) & 0xFFFF) << 16 \
+        | (flag & 0xFF) << 32 | (int(move) + _MOVE_OFFSET) << 40
+
+
+def _unpack(data: int) -> Tuple[int, int, int, GO_POINT]:
+    depth = data & 0xFFFF
+    value = ((data >> 16) & 0xFFFF) - 0x8000
+    flag = (data >> 32) & 0xFF
+    move = GO_POINT((data >> 40) - _MOVE_OFFSET)
+    return depth, value, flag, move
+
+
+class SharedTranspositionTable(object):
+    def __init__(self, size_log2: int = DEFAULT_TABLE_SIZE_LOG2,
+                 name: Optional[str] = None) -> None:
+        """
+        A TranspositionTable held in multiprocessing.shared_memory,
+        so that several processes can search with the same table.
+        With name None, a new table is created and owns the memory.
+        Otherwise the existing table called name is attached.
+        Uses the same buckets and replacement policy as
+        TranspositionTable. An entry with data 0 is unused: the value
+        is packed with an offset, so stored data is never 0.
+        """
+        self.num_buckets: int = 1 << size_log2
+        self.mask: int = self.num_buckets - 1
+        n = 2 * self.num_buckets
+        self.owner: bool = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner,
+            size=n * SHARED_ENTRY_DTYPE.itemsize)
+        self.name: str = self.shm.name
+        self.size_log2: int = size_log2
+        entries = np.ndarray((n,), dtype=SHARED_ENTRY_DTYPE,
+                             buffer=self.shm.buf)
+        self.checks: np.ndarray = entries["check"]
+        self.data: np.ndarray = entries["data"]
+        if self.owner:
+            entries.fill(0)
+        self.hits: int = 0
+        self.misses: int = 0
+        self.collisions: int = 0
+
+    def close(self) -> None:
+        """ Detach from the shared memory, and free it if this owns it """
+        self.checks = None
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def clear(self) -> None:
+        self.checks.fill(0)
+        self.data.fill(0)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def _entry(self, slot: int) -> Tuple[int, int]:
+        return int(self.checks[slot]), int(self.data[slot])
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int, int, GO_POINT]]:
+        i = (key & self.mask) << 1
+        used = False
+        for slot in (i, i + 1):
+            check, data = self._entry(slot)
+            if data == 0:
+                continue
+            if check ^ data == key:
+                self.hits += 1
+                return _unpack(data)
+            used = True
+        self.misses += 1
+        if used:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, value: int, flag: int,
+              move: GO_POINT) -> None:
+        i = (key & self.mask) << 1
+        check, data = self._entry(i)
+        if data == 0 or check ^ data == key or depth >= (data & 0xFFFF):
+            slot = i
+        else:
+            slot = i + 1
+        data = _pack(depth, value, flag, move)
+        self.data[slot] = data
+        self.checks[slot] = key ^ data
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"tt_hits": self.hits,
+                "tt_misses": self.misses,
+                "tt_collisions": self.collisions}
@@ -0,0 +1,66 @@
+"""
+zobrist.py
+Zobrist hash keys for GoBoard positions.
+This file is imported by board.py.
+
+The hash of a position is the XOR of
+- one key for each stone, indexed by color and point
+- the side key if WHITE is to play
+- one key for the capture count of each color
+Keys are generated from a fixed seed per board size, so hashes are
+reproducible between runs and between processes.
+
+For symmetry canonicalization, the stone part of the hash is also
+kept for each of the 8 symmetric images of the position. The key of a
+stone in image k is the key of its point under symmetry k. The side
+and capture keys do not depend on the symmetry.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from board_base import board_array_size, BLACK, WHITE
+from board_tables import board_tables, NUM_SYMMETRIES
+
+
+class ZobristKeys(object):
+    def __init__(self, size: int) -> None:
+        rng = np.random.default_rng(size)
+        maxpoint: int = board_array_size(size)
+        max_captures: int = size * size
+        # Keys are kept as Python ints, which are much faster
+        # to XOR one at a time than numpy uint64 scalars.
+        stones = rng.integers(0, 2**64, size=(3, maxpoint),
+                              dtype=np.uint64, endpoint=False)
+        self.stones: List[List[int]] = [
+            [int(k) for k in row] for row in stones]
+        self.side: int = int(rng.integers(0, 2**64, dtype=np.uint64))
+        captures = rng.integers(0, 2**64, size=(3, max_captures + 1),
+                                dtype=np.uint64, endpoint=False)
+        self.captures: List[List[int]] = [
+            [int(k) for k in row] for row in captures]
+        # No captures is the starting state, so it does not change the hash
+        self.captures[BLACK][0] = 0
+        self.captures[WHITE][0] = 0
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> ZobristKeys:
+    """ Return the keys for boards of the given size, created once """
+    return ZobristKeys(size)
+
+
+@lru_cache(maxsize=None)
+def symmetric_stone_keys(size: int) -> List[List[Tuple[int, ...]]]:
+    """
+    For each color and point, the NUM_SYMMETRIES keys of a stone of
+    that color on that point in the symmetric images of the board
+    """
+    stones = zobrist_keys(size).stones
+    symmetries = board_tables(size).symmetries
+    return [[tuple(row[int(symmetries[k, p])]
+                   for k in range(NUM_SYMMETRIES))
+             for p in range(len(row))]
+            for row in stones]